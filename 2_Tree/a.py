@@ -1,9 +1,27 @@
+from __future__ import annotations
+
+import csv
+import gc
 import json
+import time
+from array import array
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
 
 
 
 
+# операции пакета: имя метода Company -> (обязательные аргументы, необязательные)
+BATCH_OPERATIONS = {
+    "insert_position": (("position_name", "parent_name"), ("first_name", "second_name")),
+    "close_position": (("position_name",), ()),
+    "remove_employee": (("first_name", "second_name"), ()),
+    "hire_employee": (("position_name", "first_name", "second_name"), ()),
+    "move_position": (("position_name", "new_parent_name"), ()),
+}
+
 
 def generate_id(first_name: str, second_name: str, position_name: str) -> str:
     def pad(s: str) -> str:
@@ -22,23 +40,456 @@ class Position:
         self.id = generate_id(first_name, second_name, position_name)
 
 
-
-
-
+# компактное хранение дерева: каждая позиция - строка в колонках int32, строки имён
+# и сотрудников интернированы в одну таблицу. список подчинённых - цепочка
+# first_child/next_sibling, owner - чей это список (parent и список могут временно
+# расходиться, как у Position во время move_position и пакетов).
+# фасад CompactPosition создаётся на каждое обращение и нигде не хранится
+class PositionStore:
+    def __init__(self) -> None:
+        self.strings: list[str] = [""]
+        self.string_index: dict[str, int] = {"": 0}
+        self.name = array("i")
+        self.first = array("i")
+        self.second = array("i")
+        self.parent = array("i")
+        self.owner = array("i")
+        self.first_child = array("i")
+        self.last_child = array("i")
+        self.next_sibling = array("i")
+        self.prev_sibling = array("i")
+
+    def intern(self, value: str) -> int:
+        i = self.string_index.get(value)
+        if i is None:
+            i = len(self.strings)
+            self.string_index[value] = i
+            self.strings.append(value)
+        return i
+
+    def add(self, position_name: str, first_name: str = "", second_name: str = "", parent: CompactPosition | None = None) -> CompactPosition:
+        i = len(self.name)
+        self.name.append(self.intern(position_name))
+        self.first.append(self.intern(first_name))
+        self.second.append(self.intern(second_name))
+        self.parent.append(parent.index if parent is not None else -1)
+        for column in (self.owner, self.first_child, self.last_child, self.next_sibling, self.prev_sibling):
+            column.append(-1)
+        return CompactPosition(self, i)
+
+    def view(self, i: int) -> CompactPosition:
+        return CompactPosition(self, i)
+
+    def link(self, owner: int, child: int) -> None:
+        if self.owner[child] != -1:
+            self.unlink(child)
+        last = self.last_child[owner]
+        self.owner[child] = owner
+        self.prev_sibling[child] = last
+        self.next_sibling[child] = -1
+        if last == -1:
+            self.first_child[owner] = child
+        else:
+            self.next_sibling[last] = child
+        self.last_child[owner] = child
+
+    def unlink(self, child: int) -> None:
+        owner = self.owner[child]
+        prev, next_ = self.prev_sibling[child], self.next_sibling[child]
+        if prev == -1:
+            self.first_child[owner] = next_
+        else:
+            self.next_sibling[prev] = next_
+        if next_ == -1:
+            self.last_child[owner] = prev
+        else:
+            self.prev_sibling[next_] = prev
+        self.owner[child] = self.prev_sibling[child] = self.next_sibling[child] = -1
+
+
+# список подчинённых поверх цепочки в PositionStore: то, что Company делает с
+# subordinates (обход, append, remove, reversed, len), работает без отдельного list
+class ChildList:
+    __slots__ = ("store", "index")
+
+    def __init__(self, store: PositionStore, index: int) -> None:
+        self.store = store
+        self.index = index
+
+    def __iter__(self):
+        store = self.store
+        child = store.first_child[self.index]
+        # следующий берётся до yield: текущего могут перецепить в другой список
+        while child != -1:
+            next_ = store.next_sibling[child]
+            yield store.view(child)
+            child = next_
+
+    def __reversed__(self):
+        store = self.store
+        child = store.last_child[self.index]
+        while child != -1:
+            prev = store.prev_sibling[child]
+            yield store.view(child)
+            child = prev
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __bool__(self) -> bool:
+        return self.store.first_child[self.index] != -1
+
+    def __getitem__(self, k: int) -> CompactPosition:
+        return list(self)[k]
+
+    def append(self, child: CompactPosition) -> None:
+        self.store.link(self.index, child.index)
+
+    def extend(self, children) -> None:
+        for child in list(children):
+            self.append(child)
+
+    def remove(self, child: CompactPosition) -> None:
+        if self.store.owner[child.index] != self.index:
+            raise ValueError("позиции нет среди подчинённых")
+        self.store.unlink(child.index)
+
+
+# фасад строки PositionStore с тем же набором полей, что у Position; id не хранится,
+# а считается generate_id от текущих имён. фасады одной строки - разные объекты,
+# поэтому позиции сравниваются через ==, а не is
+class CompactPosition:
+    __slots__ = ("store", "index")
+
+    def __init__(self, store: PositionStore, index: int) -> None:
+        self.store = store
+        self.index = index
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CompactPosition) and other.store is self.store and other.index == self.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.store), self.index))
+
+    @property
+    def name(self) -> str:
+        return self.store.strings[self.store.name[self.index]]
+
+    @name.setter
+    def name(self, value: str) -> None:
+        self.store.name[self.index] = self.store.intern(value)
+
+    @property
+    def first_name(self) -> str:
+        return self.store.strings[self.store.first[self.index]]
+
+    @first_name.setter
+    def first_name(self, value: str) -> None:
+        self.store.first[self.index] = self.store.intern(value)
+
+    @property
+    def second_name(self) -> str:
+        return self.store.strings[self.store.second[self.index]]
+
+    @second_name.setter
+    def second_name(self, value: str) -> None:
+        self.store.second[self.index] = self.store.intern(value)
+
+    @property
+    def id(self) -> str:
+        return generate_id(self.first_name, self.second_name, self.name)
+
+    @id.setter
+    def id(self, value: str) -> None:
+        pass
+
+    @property
+    def parent(self) -> CompactPosition | None:
+        i = self.store.parent[self.index]
+        return self.store.view(i) if i != -1 else None
+
+    @parent.setter
+    def parent(self, value: CompactPosition | None) -> None:
+        self.store.parent[self.index] = value.index if value is not None else -1
+
+    @property
+    def subordinates(self) -> ChildList:
+        return ChildList(self.store, self.index)
+
+    @subordinates.setter
+    def subordinates(self, children) -> None:
+        children = list(children)
+        store = self.store
+        while store.first_child[self.index] != -1:
+            store.unlink(store.first_child[self.index])
+        for child in children:
+            store.link(self.index, child.index)
+
+
+
+
+
+
+
+# эйлеров обход дерева: позиция получает номер входа, глубину и размер поддерева,
+# X лежит в поддереве Y, если entry[Y] <= entry[X] < entry[Y] + size[Y].
+# up[k][i] - предок i на 2**k уровней выше, по нему ищется общий руководитель;
+# эти таблицы строятся при первом вызове lca
+class EulerTour:
+    # key/resolve - перевод позиции в ключ словаря и обратно, как Company.key/node
+    def __init__(self, root: Position, key=None, resolve=None) -> None:
+        self.key = key or (lambda node: node)
+        self.resolve = resolve or (lambda node: node)
+        self.number: dict = {} # ключ позиции -> номер в порядке обхода
+        self.nodes: list = [] # ключи позиций в порядке обхода
+        self.depth = array("l")
+        self.size = array("l")
+        self.parents = parents = array("l")
+        self.up: list[array] | None = None
+
+        stack = [(root, -1, 0)]
+        while stack:
+            node, parent, depth = stack.pop()
+            key = self.key(node)
+            self.number[key] = len(self.nodes)
+            self.nodes.append(key)
+            self.depth.append(depth)
+            self.size.append(1)
+            parents.append(parent)
+            me = len(self.nodes) - 1
+            for child in reversed(node.subordinates):
+                stack.append((child, me, depth + 1))
+
+        # номер входа совпадает с номером в обходе, размеры копятся с конца
+        for i in range(len(self.nodes) - 1, 0, -1):
+            self.size[parents[i]] += self.size[i]
+
+    def build_up(self) -> None:
+        self.up = [array("l", (p if p >= 0 else i for i, p in enumerate(self.parents)))]
+        for _ in range(max(1, len(self.nodes)).bit_length()):
+            prev = self.up[-1]
+            self.up.append(array("l", (prev[prev[i]] for i in range(len(prev)))))
+
+    def entry(self, node: Position) -> int:
+        return self.number[self.key(node)]
+
+    def exit(self, node: Position) -> int:
+        i = self.number[self.key(node)]
+        return i + self.size[i] - 1
+
+    def is_ancestor(self, ancestor: Position, node: Position) -> bool:
+        a, i = self.number[self.key(ancestor)], self.number[self.key(node)]
+        return a <= i < a + self.size[a]
+
+    def lca(self, first: Position, second: Position) -> Position:
+        if self.up is None:
+            self.build_up()
+        a, b = self.number[self.key(first)], self.number[self.key(second)]
+        if self.depth[a] < self.depth[b]:
+            a, b = b, a
+        diff = self.depth[a] - self.depth[b]
+        k = 0
+        while diff:
+            if diff & 1:
+                a = self.up[k][a]
+            diff >>= 1
+            k += 1
+        if a == b:
+            return self.resolve(self.nodes[a])
+        for k in range(len(self.up) - 1, -1, -1):
+            if self.up[k][a] != self.up[k][b]:
+                a, b = self.up[k][a], self.up[k][b]
+        return self.resolve(self.nodes[self.up[0][a]])
 
 
 class Company:
     def __init__(self, root: Position) -> None:
         self.root = root
+        self.tour: EulerTour | None = None # перестраивается лениво после изменений дерева
+        self.stale_steps = 0 # шаги запросов пешком по дереву с последнего изменения
+        self.positions = 0 # позиций в индексах
+        # компактное дерево: новые позиции заводятся в том же хранилище, что и корень
+        self.store: PositionStore | None = root.store if isinstance(root, CompactPosition) else None
+        # индексы для поиска без обхода дерева, обновляются каждой операцией.
+        # значения - списки: имена и id из generate_id у разных позиций могут совпасть.
+        # в списках ключи позиций (см. key), у компактного дерева - номера строк
+        self.by_name: dict[str, list] = {}
+        self.by_employee: dict[tuple[str, str], list] = {}
+        self.by_id: dict[str, list] = {}
+        if root is not None:
+            self.index_subtree(root)
+
+    def index_subtree(self, node: Position) -> None:
+        queue = deque([node])
+        while queue:
+            current = queue.popleft()
+            self.index_position(current)
+            queue.extend(current.subordinates)
+
+    # ключ позиции в индексах: сама позиция, а у компактного дерева - номер строки,
+    # чтобы индексы не держали по фасаду на каждую позицию
+    def key(self, node: Position):
+        return node.index if self.store is not None else node
+
+    def node(self, key) -> Position:
+        return self.store.view(key) if self.store is not None else key
+
+    def index_position(self, node: Position) -> None:
+        key = self.key(node)
+        self.positions += 1
+        self.by_name.setdefault(node.name, []).append(key)
+        self.by_id.setdefault(node.id, []).append(key)
+        if node.first_name or node.second_name:
+            self.by_employee.setdefault((node.first_name, node.second_name), []).append(key)
+
+    def unindex_position(self, node: Position) -> None:
+        key = self.key(node)
+        self.positions -= 1
+        self.drop_from(self.by_name, node.name, key)
+        self.drop_from(self.by_id, node.id, key)
+        self.drop_from(self.by_employee, (node.first_name, node.second_name), key)
+
+    @staticmethod
+    def drop_from(index: dict, key, node) -> None:
+        nodes = index.get(key)
+        if nodes is None:
+            return
+        for i, other in enumerate(nodes):
+            if other == node:
+                nodes.pop(i)
+                break
+        if not nodes:
+            del index[key]
+
+    # смена сотрудника меняет ключ сотрудника и id позиции
+    def set_employee(self, node: Position, first_name: str, second_name: str) -> None:
+        self.unindex_position(node)
+        node.first_name = first_name
+        node.second_name = second_name
+        node.id = generate_id(first_name, second_name, node.name)
+        self.index_position(node)
+
+    def new_position(self, position_name: str, first_name: str = "", second_name: str = "", parent: Position | None = None) -> Position:
+        if self.store is not None:
+            return self.store.add(position_name, first_name, second_name, parent)
+        return Position(position_name, first_name, second_name, parent)
+
+    # из позиций с одинаковым ключом выбирается та, что первой встретилась бы при обходе
+    # дерева в ширину: меньшая глубина, при равной - путь левее по спискам подчинённых
+    def first_in_bfs(self, keys: list) -> Position:
+        if len(keys) == 1:
+            return self.node(keys[0])
+        return min(map(self.node, keys), key=self.bfs_rank)
+
+    @staticmethod
+    def bfs_rank(node: Position) -> tuple[int, list[int]]:
+        path = []
+        while node.parent is not None:
+            path.append(list(node.parent.subordinates).index(node))
+            node = node.parent
+        path.reverse()
+        return len(path), path
+
+    # вакансии в by_employee не попадают, пустое имя ищется обходом в ширину, как до индексов
+    def find_by_employee(self, first_name: str, second_name: str) -> Position | None:
+        if not first_name and not second_name:
+            queue = deque([self.root])
+            while queue:
+                current = queue.popleft()
+                if not current.first_name and not current.second_name:
+                    return current
+                queue.extend(current.subordinates)
+            return None
+        nodes = self.by_employee.get((first_name, second_name))
+        return self.first_in_bfs(nodes) if nodes else None
+
+    def find_by_id(self, position_id: str) -> Position | None:
+        nodes = self.by_id.get(position_id)
+        return self.first_in_bfs(nodes) if nodes else None
+
+    def euler_tour(self) -> EulerTour:
+        if self.tour is None:
+            self.tour = EulerTour(self.root, self.key, self.node)
+        return self.tour
+
+    def tree_changed(self) -> None:
+        self.tour = None
+        self.stale_steps = 0
+
+    # после изменения дерева запросы идут пешком по parent и subordinates. когда
+    # пройденных шагов набирается столько же, сколько позиций, перестройка тура
+    # окупается, и дальше запросы отвечаются по нему
+    def current_tour(self) -> EulerTour | None:
+        if self.tour is None and self.stale_steps >= self.positions:
+            self.euler_tour()
+        return self.tour
+
+    # входит ли position_name в подчинение manager_name (сама позиция не считается)
+    def reports_to(self, position_name: str, manager_name: str) -> bool:
+        position = self.find_by_name(position_name)
+        manager = self.find_by_name(manager_name)
+        if position is None or manager is None or position == manager:
+            return False
+        tour = self.current_tour()
+        if tour is not None:
+            return tour.is_ancestor(manager, position)
+
+        node = position.parent
+        steps = 1
+        while node is not None and node != manager:
+            node = node.parent
+            steps += 1
+        self.stale_steps += steps
+        return node is not None
+
+    # число позиций в подчинении, прямом и косвенном
+    def subtree_size(self, position_name: str) -> int:
+        position = self.find_by_name(position_name)
+        if position is None:
+            return 0
+        tour = self.current_tour()
+        if tour is not None:
+            return tour.size[tour.entry(position)] - 1
+
+        count = 0
+        queue = deque([position])
+        while queue:
+            count += 1
+            queue.extend(queue.popleft().subordinates)
+        self.stale_steps += count
+        return count - 1
+
+    def common_manager(self, first_name: str, second_name: str) -> Position | None:
+        first = self.find_by_name(first_name)
+        second = self.find_by_name(second_name)
+        if first is None or second is None:
+            return None
+        tour = self.current_tour()
+        if tour is not None:
+            return tour.lca(first, second)
+
+        ancestors = set()
+        node = first
+        while node is not None:
+            ancestors.add(self.key(node))
+            node = node.parent
+        steps = len(ancestors)
+        node = second
+        while self.key(node) not in ancestors:
+            node = node.parent
+            steps += 1
+        self.stale_steps += steps
+        return node
 
     @classmethod
-    def from_json(cls, file_path: str) -> Company:
+    def from_json(cls, file_path: str, compact: bool = False) -> Company:
         with open(file_path, encoding="utf-8") as file:
             records = json.load(file)
 
+        make = PositionStore().add if compact else Position
         nodes: dict[str, Position] = {}
         for record in records:
-            node = Position(record["name"], record.get("first_name", ""), record.get("second_name", ""))
+            node = make(record["name"], record.get("first_name", ""), record.get("second_name", ""))
             nodes[record["name"]] = node
 
         root = None
@@ -54,20 +505,82 @@ class Company:
 
         return cls(root)
 
+    # потоковая загрузка из NDJSON (по записи на строку) или CSV с заголовком
+    # name,first_name,second_name,parent. файлы читаются кусками по chunk_size строк,
+    # с processes > 1 куски разбираются в процессах, а связывание идёт в одном месте:
+    # ссылка на ещё не встреченного родителя ждёт его в таблице pending, даже если он
+    # лежит в другом файле. число записей и скорость - в company.import_stats
+    @classmethod
+    def from_stream(cls, paths: str | list[str], processes: int | None = None, chunk_size: int = 10000,
+                    compact: bool = False) -> Company:
+        # на время загрузки сборщик циклов выключен: он многократно обходит
+        # миллионы новых позиций, хотя мусора при загрузке не появляется
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            company = cls.link_stream(paths, processes, chunk_size, compact)
+        finally:
+            if collecting:
+                gc.enable()
+        return company
+
+    @classmethod
+    def link_stream(cls, paths: str | list[str], processes: int | None, chunk_size: int, compact: bool) -> Company:
+        started = time.perf_counter()
+        make = PositionStore().add if compact else Position
+        nodes: dict[str, Position] = {}
+        pending: dict[str, list[Position]] = {}
+        root = None
+        chunks = 0
+
+        for records in parse_stream([paths] if isinstance(paths, str) else paths, processes, chunk_size):
+            chunks += 1
+            for name, first_name, second_name, parent_name in records:
+                if name in nodes:
+                    raise ValueError(f"позиция {name} встречается дважды")
+                node = make(name, first_name, second_name)
+                nodes[name] = node
+                if not parent_name:
+                    if root is not None:
+                        raise ValueError(f"два корня: {root.name} и {name}")
+                    root = node
+                elif parent_name in nodes:
+                    parent = nodes[parent_name]
+                    node.parent = parent
+                    parent.subordinates.append(node)
+                else:
+                    pending.setdefault(parent_name, []).append(node)
+
+                # подчинённые, пришедшие раньше, идут первыми: порядок записей сохраняется
+                for child in pending.pop(name, ()):
+                    child.parent = node
+                    node.subordinates.append(child)
+
+        if pending:
+            missing = ", ".join(sorted(pending)[:5])
+            raise ValueError(f"родитель не найден: {missing}")
+        if root is None:
+            raise ValueError("нет корневой позиции")
+
+        company = cls(root)
+        # позиции, замкнутые в цикл, до корня не доходят и в индексы не попадают
+        indexed = sum(map(len, company.by_name.values()))
+        if indexed != len(nodes):
+            raise ValueError(f"{len(nodes) - indexed} позиций не связаны с корнем")
+
+        seconds = time.perf_counter() - started
+        company.import_stats = {
+            "records": len(nodes),
+            "chunks": chunks,
+            "seconds": seconds,
+            "records_per_sec": len(nodes) / seconds if seconds else float("inf"),
+        }
+        return company
+
 
-    #бфс
     def find_by_name(self, name: str) -> Position|None:
-        if self.root is None:
-            return None
-        queue= deque()
-        queue.append(self.root)
-        while len(queue) >0:
-            current = queue.popleft()
-            if current.name==name:
-                return current
-            for subordinate in current.subordinates:
-                queue.append(subordinate)
-        return None
+        nodes = self.by_name.get(name)
+        return self.first_in_bfs(nodes) if nodes else None
 
     def insert_position(self, position_name: str, parent_name: str, first_name: str = "",second_name: str = "") -> None:
         parent = self.find_by_name(parent_name)
@@ -75,8 +588,10 @@ class Company:
             print("направление не найдено")
             return
 
-        new_position = Position(position_name, first_name,second_name, parent)
+        new_position = self.new_position(position_name, first_name,second_name, parent)
         parent.subordinates.append(new_position)
+        self.index_position(new_position)
+        self.tree_changed()
 
     def print_structure(self) -> None:
         self.print_node(self.root, 0)
@@ -101,28 +616,22 @@ class Company:
             return
 
         position.parent.subordinates.remove(position)
+        self.tree_changed()
+        # вместе с позицией из дерева уходит всё её поддерево
+        queue = deque([position])
+        while queue:
+            current = queue.popleft()
+            self.unindex_position(current)
+            queue.extend(current.subordinates)
 
 
 
-    #бфс
     def remove_employee(self, first_name: str, second_name: str) -> None:
-        if self.root is None:
+        current = self.find_by_employee(first_name, second_name)
+        if current is None:
+            print(f"Сотрудник не найден")
             return
-        queue = deque()
-        queue.append(self.root)
-
-        while len(queue) > 0:
-
-            current = queue.popleft()
-            if current.first_name == first_name and current.second_name == second_name:
-                current.first_name = ""
-                current.second_name = ""
-                current.id = generate_id("", "", current.name)
-                return
-            for subordinate in current.subordinates:
-                queue.append(subordinate)
-
-        print(f"Сотрудник не найден")
+        self.set_employee(current, "", "")
 
     def hire_employee(self, position_name: str, first_name: str, second_name: str) -> None:
         position = self.find_by_name(position_name)
@@ -136,9 +645,7 @@ class Company:
             print("должность занята")
             return
 
-        position.first_name = first_name
-        position.second_name = second_name
-        position.id = generate_id(first_name, second_name, position_name)
+        self.set_employee(position, first_name, second_name)
 
 
     def move_position(self, position_name: str, new_parent_name: str) -> None:
@@ -167,25 +674,262 @@ class Company:
         position.subordinates = []
         position.parent = new_parent
         new_parent.subordinates.append(position)
+        self.tree_changed()
+
+
+    # пакет изменений: операции - словари {"op": имя метода, аргументы метода}.
+    # сначала проверяется формат всего пакета, потом операции применяются по индексам
+    # с журналом отката. удалённые из subordinates позиции вычищаются один раз в конце,
+    # а не list.remove на каждую операцию. atomic=True: при первой ошибке всё откатывается,
+    # atomic=False: ошибочные операции пропускаются. ошибки возвращаются в отчёте
+    def apply_batch(self, operations: list[dict], atomic: bool = True) -> dict:
+        started = time.perf_counter()
+        failed = []
+        for i, operation in enumerate(operations):
+            error = self.check_operation(operation)
+            if error:
+                failed.append({"index": i, "op": operation.get("op"), "error": error})
+        if failed:
+            return self.batch_report(0, failed, True, len(operations), started)
+
+        batch = Batch(self)
+        applied = 0
+        for i, operation in enumerate(operations):
+            arguments = {name: value for name, value in operation.items() if name != "op"}
+            # операции Batch проверяют всё до первой правки, так что ошибочная ничего не меняет.
+            # исключение же могло оборвать операцию на середине: пакет откатывается целиком
+            try:
+                error = getattr(batch, operation["op"])(**arguments)
+            except Exception as exc:
+                failed.append({"index": i, "op": operation["op"], "error": f"{type(exc).__name__}: {exc}"})
+                batch.rollback()
+                return self.batch_report(0, failed, True, len(operations), started)
+            if error is None:
+                applied += 1
+                continue
+            failed.append({"index": i, "op": operation["op"], "error": error})
+            if atomic:
+                batch.rollback()
+                return self.batch_report(0, failed, True, len(operations), started)
+
+        batch.commit()
+        return self.batch_report(applied, failed, False, len(operations), started)
+
+    @staticmethod
+    def check_operation(operation) -> str | None:
+        if not isinstance(operation, dict) or operation.get("op") not in BATCH_OPERATIONS:
+            return "неизвестная операция"
+        required, optional = BATCH_OPERATIONS[operation["op"]]
+        for name in required:
+            if not isinstance(operation.get(name), str):
+                return f"нет аргумента {name}"
+        for name in optional:
+            if name in operation and not isinstance(operation[name], str):
+                return f"аргумент {name} должен быть строкой"
+        extra = set(operation) - set(required) - set(optional) - {"op"}
+        if extra:
+            return f"лишние аргументы {', '.join(sorted(extra))}"
+        return None
 
+    @staticmethod
+    def batch_report(applied: int, failed: list, rolled_back: bool, total: int, started: float) -> dict:
+        seconds = time.perf_counter() - started
+        return {
+            "applied": applied,
+            "failed": failed,
+            "rolled_back": rolled_back,
+            "seconds": seconds,
+            "ops_per_sec": total / seconds if seconds else float("inf"),
+        }
+
+
+# применение пакета к Company. дерево меняется копированием при записи: перед первой правкой
+# позиции запоминаются её parent и subordinates, индексы меняются через журнал обратимых записей
+class Batch:
+    def __init__(self, company: Company) -> None:
+        self.company = company
+        self.saved: dict[Position, tuple] = {} # позиция -> (позиция, parent, subordinates)
+        self.log: list[tuple] = []
+        self.closed: set[Position] = set()
+
+    def touch(self, node: Position) -> None:
+        if node not in self.saved:
+            self.saved[node] = (node, node.parent, list(node.subordinates))
+
+    def index(self, node: Position) -> None:
+        self.company.index_position(node)
+        self.log.append(("index", node))
+
+    def unindex(self, node: Position) -> None:
+        self.company.unindex_position(node)
+        self.log.append(("unindex", node))
+
+    # живые подчинённые: в списках до commit остаются ушедшие и закрытые позиции.
+    # у повторно добавленной позиции в силе последнее вхождение, как после remove + append
+    def children(self, node: Position) -> list[Position]:
+        seen = set()
+        result = []
+        for child in reversed(node.subordinates):
+            if child.parent == node and child not in self.closed and child not in seen:
+                seen.add(child)
+                result.append(child)
+        result.reverse()
+        return result
+
+    def insert_position(self, position_name: str, parent_name: str, first_name: str = "", second_name: str = "") -> str | None:
+        parent = self.company.find_by_name(parent_name)
+        if parent is None:
+            return "направление не найдено"
+        self.touch(parent)
+        new_position = self.company.new_position(position_name, first_name, second_name, parent)
+        parent.subordinates.append(new_position)
+        self.index(new_position)
+        return None
 
+    def close_position(self, position_name: str) -> str | None:
+        position = self.company.find_by_name(position_name)
+        if position is None:
+            return "направление не найдено"
+        if position.parent is None:
+            return "нельзя закрыть корневую позицию"
+        self.touch(position.parent)
+        self.closed.add(position)
+        queue = deque([position])
+        while queue:
+            current = queue.popleft()
+            self.unindex(current)
+            queue.extend(self.children(current))
+        return None
 
+    def set_employee(self, node: Position, first_name: str, second_name: str) -> None:
+        self.unindex(node)
+        self.log.append(("employee", node, node.first_name, node.second_name, node.id))
+        node.first_name = first_name
+        node.second_name = second_name
+        node.id = generate_id(first_name, second_name, node.name)
+        self.index(node)
+
+    def remove_employee(self, first_name: str, second_name: str) -> str | None:
+        current = self.company.find_by_employee(first_name, second_name)
+        if current is None:
+            return "Сотрудник не найден"
+        self.set_employee(current, "", "")
+        return None
 
-company = Company.from_json("10_Tree/data.json")
-company.print_structure()
-
-company.insert_position("Математика", "Курсы", "Мария", "Козлова")
-company.print_structure()
-company.close_position("Лагеря")
-company.remove_employee("Анна", "Сидорова")
-
-company.hire_employee("Информатика", "Елена", "Громова")
-
-company.hire_employee("Информатика", "Сладкий", "Кокосик")
-company.print_structure()
+    def hire_employee(self, position_name: str, first_name: str, second_name: str) -> str | None:
+        position = self.company.find_by_name(position_name)
+        if position is None:
+            return "направление не найдено"
+        if not (position.first_name == "" and position.second_name == ""):
+            return "должность занята"
+        self.set_employee(position, first_name, second_name)
+        return None
 
+    def move_position(self, position_name: str, new_parent_name: str) -> str | None:
+        position = self.company.find_by_name(position_name)
+        new_parent = self.company.find_by_name(new_parent_name)
+        if position is None or new_parent is None:
+            return "направления не найдено"
+        if position.parent is None:
+            return "нельзя перенести корневую позицию"
+        if new_parent == position:
+            return "нельзя перенести позицию под саму себя"
 
+        old_parent = position.parent
+        children = self.children(position)
+        for node in [position, old_parent, new_parent] + children:
+            self.touch(node)
+        for subordinate in children:
+            subordinate.parent = old_parent
+            old_parent.subordinates.append(subordinate)
+        position.subordinates = []
+        position.parent = new_parent
+        new_parent.subordinates.append(position)
+        return None
 
-company2 = Company.from_json("10_Tree/data.json")
-company2.move_position("Информатика", "Лагеря")
-company2.print_structure()
\ No newline at end of file
+    def rollback(self) -> None:
+        while self.log:
+            entry = self.log.pop()
+            kind, node = entry[0], entry[1]
+            if kind == "index":
+                self.company.unindex_position(node)
+            elif kind == "unindex":
+                self.company.index_position(node)
+            elif kind == "employee":
+                node.first_name, node.second_name, node.id = entry[2], entry[3], entry[4]
+        for node, parent, subordinates in self.saved.values():
+            node.parent = parent
+            node.subordinates = subordinates
+        self.saved.clear()
+        self.closed.clear()
+        self.company.tree_changed()
+
+    def commit(self) -> None:
+        for node, _, _ in self.saved.values():
+            node.subordinates = self.children(node)
+        self.company.tree_changed()
+
+
+# куски строк из файлов подряд; у CSV к куску прикладывается заголовок файла
+def read_chunks(paths: list[str], chunk_size: int):
+    for path in paths:
+        with open(path, encoding="utf-8", newline="") as file:
+            header = None
+            if path.endswith(".csv"):
+                header = next(csv.reader([file.readline()]))
+            while True:
+                lines = list(islice(file, chunk_size))
+                if not lines:
+                    break
+                yield lines, header
+
+
+def parse_chunk(lines: list[str], header: list[str] | None) -> list[tuple[str, str, str, str]]:
+    if header is None:
+        # кусок разбирается одним вызовом json как список, а не по строке
+        rows = json.loads("[" + ",".join(filter(str.strip, lines)) + "]")
+    else:
+        rows = csv.DictReader(lines, fieldnames=header)
+    return [
+        (row["name"], row.get("first_name") or "", row.get("second_name") or "", row.get("parent") or "")
+        for row in rows
+    ]
+
+
+# разобранные куски в порядке чтения. в процессах одновременно не больше
+# двух кусков на процесс, так что файл не читается в память целиком
+def parse_stream(paths: list[str], processes: int | None, chunk_size: int):
+    if not processes or processes < 2:
+        for lines, header in read_chunks(paths, chunk_size):
+            yield parse_chunk(lines, header)
+        return
+
+    with ProcessPoolExecutor(processes) as pool:
+        waiting = deque()
+        for lines, header in read_chunks(paths, chunk_size):
+            waiting.append(pool.submit(parse_chunk, lines, header))
+            if len(waiting) >= 2 * processes:
+                yield waiting.popleft().result()
+        while waiting:
+            yield waiting.popleft().result()
+
+
+if __name__ == "__main__":
+    company = Company.from_json("10_Tree/data.json")
+    company.print_structure()
+
+    company.insert_position("Математика", "Курсы", "Мария", "Козлова")
+    company.print_structure()
+    company.close_position("Лагеря")
+    company.remove_employee("Анна", "Сидорова")
+
+    company.hire_employee("Информатика", "Елена", "Громова")
+
+    company.hire_employee("Информатика", "Сладкий", "Кокосик")
+    company.print_structure()
+
+
+
+    company2 = Company.from_json("10_Tree/data.json")
+    company2.move_position("Информатика", "Лагеря")
+    company2.print_structure()
@@ -0,0 +1,54 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from a import Company
+from bench_memory import generate_records
+
+
+# выгрузка в двух видах: общий JSON-список для from_json и NDJSON-файлы по shards штук
+def write_export(records, folder, shards):
+    rows = [
+        {"name": name, "first_name": first, "second_name": second, "parent": records[parent][0] if parent >= 0 else None}
+        for name, first, second, parent in records
+    ]
+    # записи идут от листьев к корню: родитель почти всегда позже подчинённого
+    rows.reverse()
+    whole = os.path.join(folder, "export.json")
+    with open(whole, "w", encoding="utf-8") as f:
+        json.dump(rows, f, ensure_ascii=False)
+
+    paths = []
+    for k in range(shards):
+        path = os.path.join(folder, f"export_{k}.ndjson")
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in rows[k::shards])
+        paths.append(path)
+    return whole, paths
+
+
+def timed(title, n, action):
+    started = time.perf_counter()
+    action()
+    seconds = time.perf_counter() - started
+    print(f"  {title:<24} {seconds:7.2f} s, {n / seconds:10,.0f} records/sec")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--positions", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("-s", "--shards", type=int, default=4)
+    parser.add_argument("-p", "--processes", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    for n in args.positions:
+        records = generate_records(n)
+        print(f"n = {n}")
+        with tempfile.TemporaryDirectory() as folder:
+            whole, paths = write_export(records, folder, args.shards)
+            timed("from_json", n, lambda: Company.from_json(whole))
+            timed("from_stream", n, lambda: Company.from_stream(paths))
+            timed(f"from_stream, {args.processes} proc", n, lambda: Company.from_stream(paths, processes=args.processes))
+            timed("from_stream, compact", n, lambda: Company.from_stream(paths, compact=True))
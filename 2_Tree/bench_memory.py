@@ -0,0 +1,77 @@
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from a import Company, Position, PositionStore
+
+
+FIRST_NAMES = ["Анна", "Мария", "Елена", "Иван", "Пётр", "Олег", "Ольга", "Сергей"]
+SECOND_NAMES = ["Иванова", "Петров", "Сидорова", "Козлова", "Громова", "Смирнов"]
+
+
+# дерево из n позиций: родитель выбирается среди уже созданных, треть позиций вакантна
+def generate_records(n, seed=1):
+    rnd = random.Random(seed)
+    records = [("Директор", "", "", -1)]
+    for i in range(1, n):
+        parent = rnd.randrange(max(0, i - 1000), i) if i % 4 else rnd.randrange(i)
+        if rnd.random() < 0.33:
+            first, second = "", ""
+        else:
+            first, second = rnd.choice(FIRST_NAMES), rnd.choice(SECOND_NAMES)
+        records.append((f"Позиция {i}", first, second, parent))
+    return records
+
+
+def build_objects(records):
+    nodes = []
+    for name, first, second, parent in records:
+        node = Position(name, first, second, nodes[parent] if parent >= 0 else None)
+        if parent >= 0:
+            nodes[parent].subordinates.append(node)
+        nodes.append(node)
+    return nodes[0]
+
+
+def build_compact(records):
+    store = PositionStore()
+    nodes = []
+    for name, first, second, parent in records:
+        node = store.add(name, first, second, nodes[parent] if parent >= 0 else None)
+        if parent >= 0:
+            nodes[parent].subordinates.append(node)
+        nodes.append(node)
+    return nodes[0]
+
+
+def measure(build, records, with_company):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    root = build(records)
+    company = Company(root) if with_company else None
+    seconds = time.perf_counter() - started
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del root, company
+    return current, seconds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--positions", type=int, nargs="+", default=[100000, 1000000])
+    args = parser.parse_args()
+
+    for n in args.positions:
+        records = generate_records(n)
+        # строки имён создаются заранее и в замер не входят: это исходные данные
+        print(f"n = {n}")
+        for with_company in (False, True):
+            title = "дерево + индексы Company" if with_company else "только дерево"
+            plain, plain_seconds = measure(build_objects, records, with_company)
+            compact, compact_seconds = measure(build_compact, records, with_company)
+            print(f"  {title}")
+            print(f"    Position        {plain / 2**20:8.1f} MB, {plain / n:6.1f} B/позиция, {plain_seconds:6.2f} s")
+            print(f"    CompactPosition {compact / 2**20:8.1f} MB, {compact / n:6.1f} B/позиция, {compact_seconds:6.2f} s")
@@ -0,0 +1,78 @@
+import argparse
+import heapq
+import time
+import tracemalloc
+
+import main
+from main import SignalSystem
+
+
+# считает операции heapq, которые делают dijkstra() и dijkstra_objects()
+class CountingHeapq:
+    def __init__(self):
+        self.pushes = 0
+        self.pops = 0
+        self.peak = 0
+
+    def heappush(self, heap, item):
+        self.pushes += 1
+        heapq.heappush(heap, item)
+        if len(heap) > self.peak:
+            self.peak = len(heap)
+
+    def heappop(self, heap):
+        self.pops += 1
+        return heapq.heappop(heap)
+
+
+def measure(system: SignalSystem, method: str, start: str) -> dict:
+    counter = CountingHeapq()
+    main.heapq = counter
+    try:
+        tracemalloc.start()
+        started = time.perf_counter()
+        best_state = getattr(system, method)(start)
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        # без подмены heapq, чтобы время не включало накладные расходы счётчика
+        started = time.perf_counter()
+        getattr(system, method)(start)
+        clean_seconds = time.perf_counter() - started
+    finally:
+        main.heapq = heapq
+
+    if method == "dijkstra_indexed":
+        stats = system.heap_stats
+        pushes, pops, peak_heap = stats["pushes"] + stats["decreases"], stats["pops"], stats["peak"]
+    else:
+        pushes, pops, peak_heap = counter.pushes, counter.pops, counter.peak
+
+    return {
+        "method": method,
+        "seconds": clean_seconds,
+        "traced_seconds": seconds,
+        "heap_ops": pushes + pops,
+        "stale_pops": pops - len(best_state) if method != "dijkstra_indexed" else 0,
+        "peak_heap": peak_heap,
+        "peak_alloc_mb": peak / 2**20,
+        "reached": len(best_state),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", nargs="?", default="data.json")
+    parser.add_argument("-s", "--start", default=None)
+    args = parser.parse_args()
+
+    system = SignalSystem()
+    system.load_from_json(args.path)
+    start = args.start or system.start
+
+    for method in ("dijkstra_objects", "dijkstra", "dijkstra_indexed"):
+        row = measure(system, method, start)
+        print(f"{row['method']:18} {row['seconds']:8.3f} s  heap ops {row['heap_ops']:9}  "
+              f"stale pops {row['stale_pops']:8}  peak heap {row['peak_heap']}  "
+              f"peak alloc {row['peak_alloc_mb']:.1f} MB  reached {row['reached']}")
@@ -1,6 +1,44 @@
 import json
+import csv
+import hashlib
 import heapq
+import itertools
 import math
+import mmap
+import operator
+import os
+import struct
+import sys
+import time
+import tracemalloc
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+
+SWEEP_PARAMS = ["alpha", "beta", "gamma", "R_ms"]
+
+CACHE_MAGIC = b"SIGNET02"
+CACHE_COLUMNS = [
+    ("scatter", "d"),
+    ("sensor", "b"),
+    ("threshold", "d"),
+    ("edge_u", "q"),
+    ("edge_v", "q"),
+    ("edge_length", "d"),
+    ("edge_material", "q"),
+    ("edge_attenuation", "d"),
+    ("edge_noise", "d"),
+    ("edge_directed", "b"),
+    ("edge_alive", "b"),
+    ("keep", "d"),
+    ("offsets", "q"),
+    ("targets", "q"),
+    ("sources", "q"),
+    ("slot_edge", "q"),
+    ("travel_ms", "d"),
+    ("factor", "d"),
+    ("noise", "d"),
+]
 
 
 class Node:
@@ -52,6 +90,646 @@ class State:
         return self.cost < other.cost
 
 
+class SearchTree:
+    def __init__(self, start, params, best_cost, time_ms, energy, noise, parent, states):
+        self.start = start
+        self.params = params
+        self.best_cost = best_cost
+        self.time_ms = time_ms
+        self.energy = energy
+        self.noise = noise
+        self.parent = parent
+        self.states = states
+
+
+# счётчики одного поиска; тот же формат JSON отдаёт Graph.a_star в 4_AStar.
+# trace - порядок раскрытия вершин: [вершина, ключ кучи, стоимость]
+class SearchStats:
+    def __init__(self, engine: str = "", trace: bool = False):
+        self.engine = engine
+        self.expanded = 0
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+        self.pruned = 0
+        self.peak_heap = 0
+        self.heuristic_seconds = 0.0 # время в эвристике (у Дейкстры эвристики нет, всегда 0)
+        self.total_seconds = 0.0
+        self.trace: list | None = [] if trace else None
+
+    def as_dict(self) -> dict:
+        return {name: value for name, value in vars(self).items() if value is not None}
+
+    def to_json(self, path: str | None = None) -> str:
+        text = json.dumps(self.as_dict(), ensure_ascii=False)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
+
+
+# куча с индексом позиций: у каждой вершины не больше одной записи,
+# улучшение стоимости сдвигает её вверх вместо добавления устаревшего дубля
+class IndexedHeap:
+    __slots__ = ("keys", "items", "pos", "pushes", "decreases", "pops", "peak")
+
+    def __init__(self, size: int):
+        self.keys: list[float] = []
+        self.items: list[int] = []
+        self.pos = array("l", [-1]) * size
+        self.pushes = 0
+        self.decreases = 0
+        self.pops = 0
+        self.peak = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def push(self, item: int, key: float):
+        keys, items, pos = self.keys, self.items, self.pos
+        i = pos[item]
+        if i < 0:
+            i = len(items)
+            keys.append(key)
+            items.append(item)
+            self.pushes += 1
+            if i >= self.peak:
+                self.peak = i + 1
+        elif key < keys[i]:
+            self.decreases += 1
+        else:
+            return
+
+        while i > 0:
+            up = (i - 1) >> 1
+            if keys[up] <= key:
+                break
+            keys[i] = keys[up]
+            items[i] = items[up]
+            pos[items[i]] = i
+            i = up
+        keys[i] = key
+        items[i] = item
+        pos[item] = i
+
+    def pop(self) -> tuple[float, int]:
+        keys, items, pos = self.keys, self.items, self.pos
+        top_key, top = keys[0], items[0]
+        pos[top] = -1
+        self.pops += 1
+
+        key, item = keys.pop(), items.pop()
+        size = len(items)
+        if size:
+            i = 0
+            while True:
+                child = 2 * i + 1
+                if child >= size:
+                    break
+                if child + 1 < size and keys[child + 1] < keys[child]:
+                    child += 1
+                if key <= keys[child]:
+                    break
+                keys[i] = keys[child]
+                items[i] = items[child]
+                pos[items[i]] = i
+                i = child
+            keys[i] = key
+            items[i] = item
+            pos[item] = i
+        return top_key, top
+
+
+class CompiledGraph:
+    def __init__(self):
+        self.ids: list[str] = []
+        self.index: dict[str, int] = {}
+        self.defined = bytearray()
+
+        self.scatter = array("d")
+        self.sensor = array("b")
+        self.threshold = array("d")
+
+        self.materials: list[str] = []
+        self.material_index: dict[str, int] = {}
+
+        self.edge_u = array("l")
+        self.edge_v = array("l")
+        self.edge_length = array("d")
+        self.edge_material = array("l")
+        self.edge_attenuation = array("d")
+        self.edge_noise = array("d")
+        self.edge_directed = array("b")
+        self.edge_alive = array("b")
+
+        # CSR: рёбра узла i лежат в [offsets[i], offsets[i + 1])
+        self.keep = array("d")
+        self.offsets = array("l", [0])
+        self.targets = array("l")
+        self.travel_ms = array("d")
+        self.factor = array("d")
+        self.noise = array("d")
+        self.sources = array("l")
+        self.slot_edge = array("l")
+
+        # обратный CSR (номера слотов входящих рёбер), строится по требованию
+        self.rev_offsets = None
+        self.rev_slots = None
+
+        # слоты рёбер, вставленных после сборки: лежат в конце колонок вне CSR
+        # и вливаются в него при следующем полном поиске (flush)
+        self.extra: dict[int, list[int]] = {}
+        self.rev_extra: dict[int, list[int]] = {}
+
+    @classmethod
+    def from_system(cls, system: "SignalSystem") -> "CompiledGraph":
+        graph = cls()
+        for node in system.nodes.values():
+            graph.add_node(node.id, node.scatter_coeff, node.sensor, node.threshold)
+        for edge in system.edges:
+            graph.add_edge(edge.u, edge.v, edge.length_m, edge.material, edge.attenuation, edge.noise_coeff, edge.directed)
+        graph.build(system.materials)
+        return graph
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getstate__(self):
+        # колонки из mmap-кэша передаются в другие процессы как обычные массивы
+        state = dict(self.__dict__)
+        state.pop("buffer", None)
+        for name, value in state.items():
+            if isinstance(value, memoryview):
+                state[name] = array(value.format, value)
+        return state
+
+    def intern(self, node_id: str) -> int:
+        i = self.index.get(node_id)
+        if i is None:
+            i = len(self.ids)
+            self.index[node_id] = i
+            self.ids.append(node_id)
+            self.defined.append(0)
+            self.scatter.append(0.0)
+            self.sensor.append(0)
+            self.threshold.append(0.0)
+        return i
+
+    def add_node(self, node_id: str, scatter_coeff: float, sensor: bool, threshold: float):
+        i = self.intern(node_id)
+        self.defined[i] = 1
+        self.scatter[i] = scatter_coeff
+        self.sensor[i] = 1 if sensor else 0
+        self.threshold[i] = threshold
+
+    def add_edge(self, u: str, v: str, length_m: float, material: str, attenuation: float, noise_coeff: float, directed: bool):
+        m = self.material_index.get(material)
+        if m is None:
+            m = len(self.materials)
+            self.material_index[material] = m
+            self.materials.append(material)
+
+        self.edge_u.append(self.intern(u))
+        self.edge_v.append(self.intern(v))
+        self.edge_length.append(length_m)
+        self.edge_material.append(m)
+        self.edge_attenuation.append(attenuation)
+        self.edge_noise.append(noise_coeff)
+        self.edge_directed.append(1 if directed else 0)
+        self.edge_alive.append(1)
+        return len(self.edge_u) - 1
+
+    def build(self, material_speeds: dict):
+        n = len(self.ids)
+        for i in range(n):
+            if not self.defined[i]:
+                raise KeyError(self.ids[i])
+
+        speeds = [material_speeds[name] for name in self.materials]
+        edge_u, edge_v, directed, alive = self.edge_u, self.edge_v, self.edge_directed, self.edge_alive
+        m = len(edge_u)
+
+        # сортировка подсчётом по исходной вершине, порядок рёбер внутри вершины как в файле
+        offsets = array("l", [0]) * (n + 1)
+        for k in range(m):
+            if not alive[k]:
+                continue
+            offsets[edge_u[k] + 1] += 1
+            if not directed[k]:
+                offsets[edge_v[k] + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        total = offsets[n]
+        targets = array("l", [0]) * total
+        travel_ms = array("d", [0.0]) * total
+        factor = array("d", [0.0]) * total
+        noise = array("d", [0.0]) * total
+        sources = array("l", [0]) * total
+        slot_edge = array("l", [0]) * total
+        fill = offsets[:n]
+
+        for k in range(m):
+            if not alive[k]:
+                continue
+            length = self.edge_length[k]
+            t = length / speeds[self.edge_material[k]]
+            f = math.exp(-self.edge_attenuation[k] * length)
+            c = self.edge_noise[k]
+            u, v = edge_u[k], edge_v[k]
+
+            slot = fill[u]
+            fill[u] = slot + 1
+            targets[slot], travel_ms[slot], factor[slot], noise[slot] = v, t, f, c
+            sources[slot], slot_edge[slot] = u, k
+            if not directed[k]:
+                slot = fill[v]
+                fill[v] = slot + 1
+                targets[slot], travel_ms[slot], factor[slot], noise[slot] = u, t, f, c
+                sources[slot], slot_edge[slot] = v, k
+
+        self.keep = array("d", (1 - s for s in self.scatter))
+        self.offsets = offsets
+        self.targets = targets
+        self.travel_ms = travel_ms
+        self.factor = factor
+        self.noise = noise
+        self.sources = sources
+        self.slot_edge = slot_edge
+        self.rev_offsets = None
+        self.rev_slots = None
+        self.extra = {}
+        self.rev_extra = {}
+
+    def reverse(self) -> tuple[array, array]:
+        if self.rev_offsets is None:
+            n = len(self.ids)
+            rev_offsets = array("l", [0]) * (n + 1)
+            for v in self.targets:
+                rev_offsets[v + 1] += 1
+            for i in range(n):
+                rev_offsets[i + 1] += rev_offsets[i]
+            rev_slots = array("l", [0]) * len(self.targets)
+            fill = rev_offsets[:n]
+            for slot, v in enumerate(self.targets):
+                rev_slots[fill[v]] = slot
+                fill[v] += 1
+            self.rev_offsets, self.rev_slots = rev_offsets, rev_slots
+            self.rev_extra = {}
+        return self.rev_offsets, self.rev_slots
+
+    def out_slots(self, u: int):
+        slots = range(self.offsets[u], self.offsets[u + 1])
+        extra = self.extra.get(u)
+        return slots if extra is None else [*slots, *extra]
+
+    def in_slots(self, v: int):
+        rev_offsets, rev_slots = self.reverse()
+        slots = rev_slots[rev_offsets[v]:rev_offsets[v + 1]]
+        extra = self.rev_extra.get(v)
+        return slots if extra is None else [*slots, *extra]
+
+    # вливает вставленные слоты в CSR одним проходом по колонкам; номера слотов
+    # меняются, поэтому обратный CSR строится заново
+    def flush(self):
+        if not self.extra:
+            return
+        offsets = self.offsets
+        order = []
+        added = [0] * len(offsets)
+        start = 0
+        for u in sorted(self.extra):
+            extra = self.extra[u]
+            order.extend(range(start, offsets[u + 1]))
+            order.extend(extra)
+            start = offsets[u + 1]
+            added[u + 1] = len(extra)
+        order.extend(range(start, offsets[-1]))
+
+        for name in ("targets", "travel_ms", "factor", "noise", "sources", "slot_edge"):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, map(column.__getitem__, order)))
+        self.offsets = array("l", map(operator.add, offsets, itertools.accumulate(added)))
+        self.extra = {}
+        self.rev_extra = {}
+        self.rev_offsets = None
+        self.rev_slots = None
+
+    # колонки из mmap-кэша только для чтения - перед изменением графа их нужно скопировать
+    def writable(self):
+        for name, value in list(self.__dict__.items()):
+            if isinstance(value, memoryview):
+                setattr(self, name, array("l" if value.format == "q" else value.format, value))
+        self.__dict__.pop("buffer", None)
+
+    def find_edge(self, u: int, v: int) -> int:
+        for slot in self.out_slots(u):
+            if self.targets[slot] == v and self.travel_ms[slot] != math.inf:
+                return self.slot_edge[slot]
+        return -1
+
+    # слоты нового ребра k дописываются в конец колонок и попадают в extra своих вершин,
+    # без сдвига CSR; порядок как у build() восстановит flush()
+    def insert_slots(self, k: int, material_speeds: dict) -> list[int]:
+        u, v = self.edge_u[k], self.edge_v[k]
+        length = self.edge_length[k]
+        t = length / material_speeds[self.materials[self.edge_material[k]]]
+        f = math.exp(-self.edge_attenuation[k] * length)
+        c = self.edge_noise[k]
+
+        directions = [(u, v)] if self.edge_directed[k] else [(u, v), (v, u)]
+        slots = []
+        for src, dst in directions:
+            slot = len(self.targets)
+            self.targets.append(dst)
+            self.travel_ms.append(t)
+            self.factor.append(f)
+            self.noise.append(c)
+            self.sources.append(src)
+            self.slot_edge.append(k)
+            self.extra.setdefault(src, []).append(slot)
+            if self.rev_offsets is not None:
+                self.rev_extra.setdefault(dst, []).append(slot)
+            slots.append(slot)
+        return slots
+
+    def edge_slots(self, k: int) -> list[int]:
+        slots = []
+        for u in {self.edge_u[k], self.edge_v[k]}:
+            for slot in self.out_slots(u):
+                if self.slot_edge[slot] == k:
+                    slots.append(slot)
+        return slots
+
+    # пересчитывает физику слотов ребра k по тем же формулам, что и build()
+    def refresh_edge(self, k: int, material_speeds: dict) -> list[int]:
+        slots = self.edge_slots(k)
+        length = self.edge_length[k]
+        if self.edge_alive[k]:
+            t = length / material_speeds[self.materials[self.edge_material[k]]]
+        else:
+            t = math.inf
+        f = math.exp(-self.edge_attenuation[k] * length)
+        for slot in slots:
+            self.travel_ms[slot] = t
+            self.factor[slot] = f
+            self.noise[slot] = self.edge_noise[k]
+        return slots
+
+    # формат: magic, длина метаданных, метаданные (json), затем колонки с выравниванием по 8 байт
+    def save(self, path: str, meta: dict):
+        meta = dict(meta, ids=self.ids, materials_order=self.materials, columns=[])
+        blobs = []
+        offset = 0
+        for name, typecode in CACHE_COLUMNS:
+            column = getattr(self, name)
+            if column.itemsize != struct.calcsize(typecode):
+                column = array(typecode, column)
+            blob = column.tobytes()
+            meta["columns"].append([name, typecode, offset, len(blob)])
+            blobs.append(blob)
+            offset += (len(blob) + 7) // 8 * 8
+
+        head = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+        head += b" " * (-(len(CACHE_MAGIC) + 8 + len(head)) % 8)
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(CACHE_MAGIC)
+            f.write(struct.pack("<Q", len(head)))
+            f.write(head)
+            for blob in blobs:
+                f.write(blob)
+                f.write(b"\0" * (-len(blob) % 8))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def read_meta(cls, path: str) -> tuple[dict, int]:
+        with open(path, "rb") as f:
+            if f.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+                raise ValueError(f"{path}: не кэш сети")
+            (head_len,) = struct.unpack("<Q", f.read(8))
+            meta = json.loads(f.read(head_len))
+        return meta, len(CACHE_MAGIC) + 8 + head_len
+
+    # head - уже прочитанный read_meta заголовок, чтобы не разбирать таблицу ids второй раз
+    @classmethod
+    def open(cls, path: str, head: tuple[dict, int] | None = None) -> tuple["CompiledGraph", dict]:
+        meta, data_start = head if head is not None else cls.read_meta(path)
+
+        graph = cls()
+        with open(path, "rb") as f:
+            graph.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(graph.buffer)
+        for name, typecode, offset, size in meta["columns"]:
+            start = data_start + offset
+            setattr(graph, name, view[start:start + size].cast(typecode))
+        graph.rev_offsets = None
+        graph.rev_slots = None
+
+        graph.ids = meta["ids"]
+        graph.index = {nid: i for i, nid in enumerate(graph.ids)}
+        graph.defined = bytearray(b"\1") * len(graph.ids)
+        graph.materials = meta["materials_order"]
+        graph.material_index = {name: i for i, name in enumerate(graph.materials)}
+        return graph, meta
+
+
+# пиковая память процесса в МБ. модуля resource нет на Windows, а ru_maxrss
+# на macOS считается в байтах, на Linux - в килобайтах
+def peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprint(path: str, with_hash: bool = False) -> dict:
+    st = os.stat(path)
+    fingerprint = {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+    if with_hash:
+        fingerprint["sha256"] = file_sha256(path)
+    return fingerprint
+
+
+class JsonStream:
+    def __init__(self, file, chunk_size: int = 1 << 20):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"ожидался '{char}' на позиции {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # число на границе чанка могло оборваться
+            if (end == len(self.buf) or self.buf[end] in "0123456789.eE+-") and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+    def items(self):
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"ожидался ',' или ']' на позиции {self.pos - 1}")
+
+
+# пути выписываются по одному стеку: следующий путь поднимается по родителям только
+# до первой вершины, которая уже лежит в стеке, и заменяет хвост после неё. общий
+# префикс соседних путей не обходится и не собирается заново, память - глубина дерева
+# плюс имена вершин в JSON, каждое закодированное один раз
+class PathCache:
+    def __init__(self, parent_of):
+        self.parent_of = parent_of
+        self.json_names: dict[str, str] = {}
+        self.stack: list[str] = [] # последний выписанный путь
+        self.depth: dict[str, int] = {} # вершина стека -> её место в нём
+
+    # возвращает сам стек: его нужно выписать до следующего вызова
+    def chain(self, node_id: str) -> list[str]:
+        stack, depth = self.stack, self.depth
+        tail = []
+        cur = node_id
+        while cur is not None and cur not in depth:
+            tail.append(cur)
+            cur = self.parent_of(cur)
+
+        keep = 0 if cur is None else depth[cur] + 1
+        while len(stack) > keep:
+            del depth[stack.pop()]
+        for nid in reversed(tail):
+            depth[nid] = len(stack)
+            stack.append(nid)
+        return stack
+
+    def text(self, node_id: str) -> str:
+        return " → ".join(map(str, self.chain(node_id)))
+
+    def json(self, node_id: str) -> str:
+        names = self.json_names
+        parts = []
+        for nid in self.chain(node_id):
+            part = names.get(nid)
+            if part is None:
+                part = names[nid] = json.dumps(nid, ensure_ascii=False)
+            parts.append(part)
+        return "[" + ", ".join(parts) + "]"
+
+
+class TextSink:
+    def __init__(self, file, echo: bool = False):
+        self.file = file
+        self.echo = echo
+        self.count = 0
+
+    def put(self, text: str):
+        self.file.write(text)
+        if self.echo:
+            sys.stdout.write(text)
+
+    def begin(self, system: "SignalSystem"):
+        self.put(f"R = {system.R_ms} ms\nдостижимые датчики")
+
+    def write(self, row: dict, paths: PathCache):
+        self.put(f"\n{row['id']}:\ntime = {row['time']}\nenergy = {row['energy']}\nnoise = {row['noise']}\ncost = {row['cost']}\npath = {paths.text(row['id'])}")
+        self.count += 1
+
+    def end(self):
+        if not self.count:
+            self.put("\nнет достижимых датчиков")
+        if self.echo:
+            sys.stdout.write("\n")
+
+
+class JsonLinesSink:
+    def __init__(self, file):
+        self.file = file
+
+    def begin(self, system: "SignalSystem"):
+        pass
+
+    def write(self, row: dict, paths: PathCache):
+        fields = json.dumps({name: row[name] for name in ("id", "time", "energy", "noise", "cost")}, ensure_ascii=False)
+        self.file.write(f"{fields[:-1]}, \"path\": {paths.json(row['id'])}}}\n")
+
+    def end(self):
+        pass
+
+
+class CsvSink:
+    def __init__(self, file):
+        self.writer = csv.writer(file)
+
+    def begin(self, system: "SignalSystem"):
+        self.writer.writerow(["id", "time", "energy", "noise", "cost", "path"])
+
+    def write(self, row: dict, paths: PathCache):
+        self.writer.writerow([row["id"], row["time"], row["energy"], row["noise"], row["cost"], paths.text(row["id"])])
+
+    def end(self):
+        pass
+
+
+def sink_for(path: str, file, echo: bool = False):
+    if path.endswith(".jsonl"):
+        return JsonLinesSink(file)
+    if path.endswith(".csv"):
+        return CsvSink(file)
+    return TextSink(file, echo)
+
+
 class SignalSystem:
     def __init__(self):
         self.start = None
@@ -63,6 +741,9 @@ class SignalSystem:
         self.materials = {}
         self.nodes: dict[str, Node] = {}
         self.adjacency: dict[str, list[Edge]] = {}
+        self.edges: list[Edge] = []
+        self.graph: CompiledGraph | None = None
+        self.tree: SearchTree | None = None
 
     def load_from_json(self, path: str):
         with open(path) as f:
@@ -96,31 +777,749 @@ class SignalSystem:
                 noise_coeff=e["noise_coeff"],
                 directed=e["directed"],
             )
+            self.edges.append(edge)
             self.adjacency[edge.u].append(edge)
             if not edge.directed:
                 self.adjacency[edge.v].append(edge)
 
+        self.compile()
+
+    # потоковая загрузка: записи vertices/edges сразу пишутся в массивы CompiledGraph,
+    # объекты Node/Edge не создаются
+    def load_from_json_stream(self, path: str, chunk_size: int = 1 << 20, trace_memory: bool = False) -> dict:
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+
+        graph = CompiledGraph()
+        header = {}
+        with open(path, encoding="utf-8") as f:
+            stream = JsonStream(f, chunk_size)
+            stream.expect("{")
+            while stream.peek() != "}":
+                key = stream.value()
+                stream.expect(":")
+                if key == "vertices":
+                    for v in stream.items():
+                        graph.add_node(v["id"], v["scatter_coeff"], v["sensor"], v["threshold"])
+                elif key == "edges":
+                    for e in stream.items():
+                        graph.add_edge(e["u"], e["v"], e["length_m"], e["material"], e["attenuation"], e["noise_coeff"], e["directed"])
+                else:
+                    header[key] = stream.value()
+                if stream.peek() == ",":
+                    stream.expect(",")
+            stream.expect("}")
+
+        self.start = header["start"]
+        self.R_ms = header["R_ms"]
+        self.initial_energy = header["initial_energy"]
+        self.alpha = header["alpha"]
+        self.beta = header["beta"]
+        self.gamma = header["gamma"]
+        self.materials = header["materials"]
+        self.nodes = {}
+        self.adjacency = {}
+        self.edges = []
+
+        graph.build(self.materials)
+        self.graph = graph
+
+        stats = {
+            "vertices": len(graph),
+            "edges": len(graph.edge_u),
+            "seconds": time.perf_counter() - started,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        if trace_memory:
+            stats["peak_traced_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+        self.load_stats = stats
+        return stats
+
+    # fingerprint нужно снимать до разбора источника: если файл перепишут между разбором
+    # и сохранением, кэш со старыми данными не должен получить отпечаток нового файла
+    def save_cache(self, cache_path: str, source_path: str, fingerprint: dict | None = None):
+        if self.graph is None:
+            self.compile()
+        self.graph.flush()
+        meta = {
+            "source": fingerprint if fingerprint is not None else source_fingerprint(source_path, with_hash=True),
+            "start": self.start,
+            "R_ms": self.R_ms,
+            "initial_energy": self.initial_energy,
+            "alpha": self.alpha,
+            "beta": self.beta,
+            "gamma": self.gamma,
+            "materials": self.materials,
+        }
+        self.graph.save(cache_path, meta)
+
+    # заголовок кэша (meta, начало данных), если кэш соответствует источнику, иначе None
+    def read_fresh_cache(self, cache_path: str, source_path: str) -> tuple[dict, int] | None:
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            head = CompiledGraph.read_meta(cache_path)
+        except (ValueError, struct.error, json.JSONDecodeError):
+            return None
+
+        cached = head[0]["source"]
+        current = source_fingerprint(source_path)
+        if cached["mtime_ns"] == current["mtime_ns"] and cached["size"] == current["size"]:
+            return head
+        # файл трогали, но содержимое могло не поменяться
+        if cached["size"] == current["size"] and cached["sha256"] == file_sha256(source_path):
+            return head
+        return None
+
+    # открывает бинарный кэш через mmap, а если он устарел - разбирает json и пересобирает кэш
+    def load_cached(self, path: str, cache_path: str | None = None) -> bool:
+        if cache_path is None:
+            cache_path = os.path.splitext(path)[0] + ".sigbin"
+
+        head = self.read_fresh_cache(cache_path, path)
+        if head is None:
+            fingerprint = source_fingerprint(path, with_hash=True)
+            self.load_from_json_stream(path)
+            self.save_cache(cache_path, path, fingerprint)
+            return False
+
+        graph, meta = CompiledGraph.open(cache_path, head)
+        self.start = meta["start"]
+        self.R_ms = meta["R_ms"]
+        self.initial_energy = meta["initial_energy"]
+        self.alpha = meta["alpha"]
+        self.beta = meta["beta"]
+        self.gamma = meta["gamma"]
+        self.materials = meta["materials"]
+        self.nodes = {}
+        self.adjacency = {}
+        self.edges = []
+        self.graph = graph
+        return True
+
+    def compile(self) -> CompiledGraph:
+        self.graph = CompiledGraph.from_system(self)
+        return self.graph
+
     def compute_cost(self, time_ms, noise, energy):
         return self.gamma * time_ms + self.alpha * noise + self.beta * (1.0 / energy)
 
-    def dijkstra(self):
+    # общая подготовка поисков по CompiledGraph: старт по умолчанию, скомпилированный граф
+    # без отложенных рёбер, пустые метки вершин и метка старта
+    def search_setup(self, start: str | None):
+        if start is None:
+            start = self.start
+        if self.graph is None:
+            self.compile()
+        self.graph.flush()
+        g = self.graph
+
+        n = len(g)
+        best_cost = [float("inf")] * n
+        time_ms = array("d", bytes(8 * n))
+        energy = array("d", bytes(8 * n))
+        noise = array("d", bytes(8 * n))
+        parent = array("l", [-1]) * n
+
+        s = g.index[start]
+        energy[s] = self.initial_energy
+        best_cost[s] = self.compute_cost(0.0, 0.0, self.initial_energy)
+        return start, s, best_cost, time_ms, energy, noise, parent
+
+    # колонки рёбер и параметры стоимости, которые горячий цикл держит в локальных именах
+    def search_columns(self):
+        g = self.graph
+        return g.offsets, g.targets, g.travel_ms, g.factor, g.noise, g.keep, self.alpha, self.beta, self.gamma, self.R_ms
+
+    def dijkstra(self, start: str | None = None, stats: SearchStats | None = None):
+        # со сбором статистики работает отдельный цикл, основной остаётся без проверок
+        if stats is not None:
+            return self.dijkstra_traced(start, stats)
+        start, s, best_cost, time_ms, energy, noise, parent = self.search_setup(start)
+        offsets, targets, travel_ms, factor, edge_noise, keep, alpha, beta, gamma, R_ms = self.search_columns()
+        g = self.graph
+        n = len(g)
+        inf = float("inf")
+
+        heap = [(best_cost[s], s)]
+        heappop, heappush = heapq.heappop, heapq.heappush
+
+        while heap:
+            cost, u = heappop(heap)
+
+            if cost > best_cost[u]:
+                continue
+
+            t_u, e_u, n_u = time_ms[u], energy[u], noise[u]
+            for k in range(offsets[u], offsets[u + 1]):
+                new_time = t_u + travel_ms[k]
+                if new_time > R_ms:
+                    continue
+
+                v = targets[k]
+                E_new = e_u * factor[k] * keep[v]
+                if E_new <= 0:
+                    continue
+
+                new_noise = n_u + edge_noise[k]
+                new_cost = gamma * new_time + alpha * new_noise + beta * (1.0 / E_new)
+
+                if new_cost < best_cost[v]:
+                    best_cost[v] = new_cost
+                    time_ms[v] = new_time
+                    energy[v] = E_new
+                    noise[v] = new_noise
+                    parent[v] = u
+                    heappush(heap, (new_cost, v))
+
+        reached = (i for i in range(n) if best_cost[i] != inf)
+        best_state = self.collect_states(reached, best_cost, time_ms, energy, noise, parent)
+        self._best_state = best_state
+        params = (self.alpha, self.beta, self.gamma, self.R_ms, self.initial_energy)
+        self.tree = SearchTree(start, params, best_cost, time_ms, energy, noise, parent, best_state)
+        return best_state
+
+    def dijkstra_traced(self, start: str | None, stats: SearchStats):
+        clock = time.perf_counter
+        started = clock()
+        stats.engine = stats.engine or "dijkstra"
+        start, s, best_cost, time_ms, energy, noise, parent = self.search_setup(start)
+        offsets, targets, travel_ms, factor, edge_noise, keep, alpha, beta, gamma, R_ms = self.search_columns()
+        g = self.graph
+        n = len(g)
+        inf = float("inf")
+
+        heap = [(best_cost[s], s)]
+        stats.pushes += 1
+        stats.peak_heap = max(stats.peak_heap, 1)
+        trace = stats.trace
+        names = g.ids
+
+        while heap:
+            cost, u = heapq.heappop(heap)
+            stats.pops += 1
+
+            if cost > best_cost[u]:
+                stats.stale_pops += 1
+                continue
+            stats.expanded += 1
+            if trace is not None:
+                trace.append([names[u], cost, cost])
+
+            t_u, e_u, n_u = time_ms[u], energy[u], noise[u]
+            for k in range(offsets[u], offsets[u + 1]):
+                new_time = t_u + travel_ms[k]
+                v = targets[k]
+                E_new = e_u * factor[k] * keep[v]
+                if new_time > R_ms or E_new <= 0:
+                    stats.pruned += 1
+                    continue
+
+                new_noise = n_u + edge_noise[k]
+                new_cost = gamma * new_time + alpha * new_noise + beta * (1.0 / E_new)
+                if new_cost < best_cost[v]:
+                    best_cost[v] = new_cost
+                    time_ms[v] = new_time
+                    energy[v] = E_new
+                    noise[v] = new_noise
+                    parent[v] = u
+                    heapq.heappush(heap, (new_cost, v))
+                    stats.pushes += 1
+                    if len(heap) > stats.peak_heap:
+                        stats.peak_heap = len(heap)
+
+        reached = (i for i in range(n) if best_cost[i] != inf)
+        best_state = self.collect_states(reached, best_cost, time_ms, energy, noise, parent)
+        self._best_state = best_state
+        params = (self.alpha, self.beta, self.gamma, self.R_ms, self.initial_energy)
+        self.tree = SearchTree(start, params, best_cost, time_ms, energy, noise, parent, best_state)
+        stats.total_seconds += clock() - started
+        return best_state
+
+    # инкрементальные правки: граф меняется на месте, а дерево кратчайших путей последнего
+    # dijkstra() чинится только в затронутой части
+    def update_edge(self, u: str, v: str, **changes) -> dict:
+        g = self.editable_graph()
+        k = g.find_edge(g.index[u], g.index[v])
+        if k < 0:
+            raise KeyError(f"нет ребра {u} - {v}")
+
+        for name, value in changes.items():
+            if name == "length_m":
+                g.edge_length[k] = value
+            elif name == "attenuation":
+                g.edge_attenuation[k] = value
+            elif name == "noise_coeff":
+                g.edge_noise[k] = value
+            elif name == "material":
+                self.materials[value]
+                if value not in g.material_index:
+                    g.material_index[value] = len(g.materials)
+                    g.materials.append(value)
+                g.edge_material[k] = g.material_index[value]
+            else:
+                raise KeyError(f"поле {name} нельзя менять")
+
+        for edge in self.adjacency.get(u, []):
+            if edge.other(u) == v:
+                for name, value in changes.items():
+                    setattr(edge, name, value)
+                break
+
+        return self.repair(g.refresh_edge(k, self.materials))
+
+    def remove_edge(self, u: str, v: str) -> dict:
+        g = self.editable_graph()
+        k = g.find_edge(g.index[u], g.index[v])
+        if k < 0:
+            raise KeyError(f"нет ребра {u} - {v}")
+        g.edge_alive[k] = 0
+
+        for edge in self.adjacency.get(u, []):
+            if edge.other(u) == v:
+                self.edges.remove(edge)
+                self.adjacency[edge.u].remove(edge)
+                if not edge.directed:
+                    self.adjacency[edge.v].remove(edge)
+                break
+
+        # мёртвый слот остаётся в CSR с бесконечным временем до следующей сборки
+        return self.repair(g.refresh_edge(k, self.materials))
+
+    def insert_edge(self, u: str, v: str, length_m: float, material: str, attenuation: float, noise_coeff: float, directed: bool) -> dict:
+        g = self.editable_graph()
+        if u not in g.index or v not in g.index:
+            raise KeyError(f"нет вершины {u if u not in g.index else v}")
+        self.materials[material]
+
+        k = g.add_edge(u, v, length_m, material, attenuation, noise_coeff, directed)
+        slots = g.insert_slots(k, self.materials)
+        if self.nodes:
+            edge = Edge(u, v, length_m, material, attenuation, noise_coeff, directed)
+            self.edges.append(edge)
+            self.adjacency[u].append(edge)
+            if not directed:
+                self.adjacency[v].append(edge)
+
+        return self.repair(slots)
+
+    def update_material(self, material: str, speed: float) -> dict:
+        g = self.editable_graph()
+        self.materials[material] = speed
+        m = g.material_index.get(material)
+        if m is None:
+            return self.repair([])
+
+        slots = []
+        edge_material, edge_alive = g.edge_material, g.edge_alive
+        for k in range(len(g.edge_u)):
+            if edge_material[k] == m and edge_alive[k]:
+                slots.extend(g.refresh_edge(k, self.materials))
+        return self.repair(slots)
+
+    def editable_graph(self) -> CompiledGraph:
+        if self.graph is None:
+            self.compile()
+        self.graph.writable()
+        return self.graph
+
+    # changed - слоты CSR, у которых поменялись параметры. поддеревья под изменёнными рёбрами
+    # дерева сбрасываются и заново получают метки от входящих рёбер, затем Дейкстра дорабатывает
+    # кучу. метка вершины в полном прогоне - лучшее продолжение итоговых меток её соседей,
+    # поэтому после починки результат совпадает с полным прогоном
+    def repair(self, changed: list[int]) -> dict:
+        tree = self.tree
+        if tree is None or tree.params != (self.alpha, self.beta, self.gamma, self.R_ms, self.initial_energy):
+            return self.dijkstra(tree.start if tree else None)
+        g = self.graph
+        # когда меняется заметная доля рёбер (например, скорость материала), полный прогон дешевле
+        if len(changed) * 10 > len(g.targets):
+            return self.dijkstra(tree.start)
+
+        targets, sources, out_slots, in_slots = g.targets, g.sources, g.out_slots, g.in_slots
+        travel_ms, factor, edge_noise, keep = g.travel_ms, g.factor, g.noise, g.keep
+        alpha, beta, gamma, R_ms = self.alpha, self.beta, self.gamma, self.R_ms
+        best_cost, time_ms, energy, noise, parent = tree.best_cost, tree.time_ms, tree.energy, tree.noise, tree.parent
+        inf = float("inf")
+
+        heap = []
+        touched = set()
+        invalidated = 0
+
+        def relax(k):
+            u = sources[k]
+            if best_cost[u] == inf:
+                return
+            new_time = time_ms[u] + travel_ms[k]
+            if new_time > R_ms:
+                return
+            v = targets[k]
+            E_new = energy[u] * factor[k] * keep[v]
+            if E_new <= 0:
+                return
+            new_noise = noise[u] + edge_noise[k]
+            new_cost = gamma * new_time + alpha * new_noise + beta * (1.0 / E_new)
+            if new_cost < best_cost[v]:
+                best_cost[v] = new_cost
+                time_ms[v] = new_time
+                energy[v] = E_new
+                noise[v] = new_noise
+                parent[v] = u
+                touched.add(v)
+                heapq.heappush(heap, (new_cost, v))
+
+        # сбрасывает поддеревья roots и заново собирает их метки с входящих рёбер
+        def invalidate(roots):
+            nonlocal invalidated
+            invalid = set()
+            stack = list(roots)
+            while stack:
+                x = stack.pop()
+                if x in invalid:
+                    continue
+                invalid.add(x)
+                for k in out_slots(x):
+                    w = targets[k]
+                    if parent[w] == x and w not in invalid:
+                        stack.append(w)
+
+            for x in invalid:
+                best_cost[x] = inf
+                parent[x] = -1
+            touched.update(invalid)
+            invalidated += len(invalid)
+
+            for x in invalid:
+                for k in in_slots(x):
+                    relax(k)
+
+        invalidate([targets[k] for k in changed if parent[targets[k]] == sources[k]])
+        for k in changed:
+            relax(k)
+
+        # у снятой вершины метка новая, поэтому метки её детей в дереве устарели
+        while heap:
+            cost, u = heapq.heappop(heap)
+            if cost != best_cost[u]:
+                continue
+            slots = out_slots(u)
+            invalidate([targets[k] for k in slots if parent[targets[k]] == u])
+            for k in slots:
+                relax(k)
+
+        # прежний результат остаётся у вызывающего как есть, чинится копия
+        best_state = tree.states = dict(tree.states)
+        ids = g.ids
+        for x in touched:
+            best_state.pop(ids[x], None)
+        reached = [x for x in touched if best_cost[x] != inf]
+        best_state.update(self.collect_states(reached, best_cost, time_ms, energy, noise, parent))
+
+        self._best_state = best_state
+        self.repair_stats = {"changed_slots": len(changed), "invalidated": invalidated, "touched": len(touched)}
+        return best_state
+
+    # многокритериальный поиск: в каждой вершине хранится фронт Парето по (время, шум, энергия),
+    # поэтому путь с большей энергией не теряется из-за более высокой скалярной стоимости.
+    # метки снимаются с кучи по возрастанию cost: доминирующая метка всегда дешевле доминируемой,
+    # а первая снятая метка датчика с энергией не ниже порога - лучший допустимый путь к нему
+    def pareto(self, start: str | None = None, buckets: int = 16) -> list[dict]:
+        if start is None:
+            start = self.start
+        if self.graph is None:
+            self.compile()
+        self.graph.flush()
+        g = self.graph
+
+        n = len(g)
+        offsets, targets, travel_ms, factor, edge_noise, keep, alpha, beta, gamma, R_ms = self.search_columns()
+        sensor, threshold = g.sensor, g.threshold
+
+        sensors = [i for i in range(n) if sensor[i]]
+        min_threshold = min((threshold[i] for i in sensors), default=0.0)
+        remaining = len(sensors)
+        best = {}
+
+        # метки в плоских массивах, метка - индекс
+        lab_node = array("l")
+        lab_time = array("d")
+        lab_noise = array("d")
+        lab_energy = array("d")
+        lab_cost = array("d")
+        lab_parent = array("l")
+
+        # фронт вершины разбит на корзины по времени: доминировать могут только метки из корзин не позже
+        fronts: list[list[list[int]] | None] = [None] * n
+        scale = buckets / R_ms if R_ms > 0 else 0.0
+
+        def dominated(v: int, t: float, nz: float, E: float) -> bool:
+            front = fronts[v]
+            if front is None:
+                return False
+            for bucket in front[:min(buckets - 1, int(t * scale)) + 1]:
+                for lab in bucket:
+                    if lab_time[lab] <= t and lab_noise[lab] <= nz and lab_energy[lab] >= E:
+                        return True
+            return False
+
+        stats = {"labels": 0, "settled": 0, "dominated": 0, "pruned": 0}
+
+        def add_label(v, t, nz, E, cost, parent):
+            lab_node.append(v)
+            lab_time.append(t)
+            lab_noise.append(nz)
+            lab_energy.append(E)
+            lab_cost.append(cost)
+            lab_parent.append(parent)
+            stats["labels"] += 1
+            return len(lab_node) - 1
+
+        s = g.index[start]
+        cost0 = self.compute_cost(0.0, 0.0, self.initial_energy)
+        heap = [(cost0, add_label(s, 0.0, 0.0, self.initial_energy, cost0, -1))]
+        heappop, heappush = heapq.heappop, heapq.heappush
+
+        while heap and remaining:
+            cost, lab = heappop(heap)
+            u = lab_node[lab]
+            t_u, n_u, e_u = lab_time[lab], lab_noise[lab], lab_energy[lab]
+
+            if dominated(u, t_u, n_u, e_u):
+                stats["dominated"] += 1
+                continue
+            if fronts[u] is None:
+                fronts[u] = [[] for _ in range(buckets)]
+            fronts[u][min(buckets - 1, int(t_u * scale))].append(lab)
+            stats["settled"] += 1
+
+            if sensor[u] and u not in best and e_u >= threshold[u]:
+                best[u] = lab
+                remaining -= 1
+
+            for k in range(offsets[u], offsets[u + 1]):
+                new_time = t_u + travel_ms[k]
+                if new_time > R_ms:
+                    continue
+
+                v = targets[k]
+                E_new = e_u * factor[k] * keep[v]
+                if E_new <= 0:
+                    continue
+                # энергия дальше только падает - ни один датчик такую метку не примет
+                if E_new < min_threshold:
+                    stats["pruned"] += 1
+                    continue
+
+                new_noise = n_u + edge_noise[k]
+                if dominated(v, new_time, new_noise, E_new):
+                    stats["dominated"] += 1
+                    continue
+
+                new_cost = gamma * new_time + alpha * new_noise + beta * (1.0 / E_new)
+                heappush(heap, (new_cost, add_label(v, new_time, new_noise, E_new, new_cost, lab)))
+
+        self.search_stats = stats
+
+        ids = g.ids
+        rows = []
+        for i in sorted(best, key=ids.__getitem__):
+            lab = best[i]
+            path = []
+            cur = lab
+            while cur >= 0:
+                path.append(ids[lab_node[cur]])
+                cur = lab_parent[cur]
+            path.reverse()
+            rows.append({
+                "id": ids[i],
+                "time": lab_time[lab],
+                "energy": lab_energy[lab],
+                "noise": lab_noise[lab],
+                "cost": lab_cost[lab],
+                "path": path,
+            })
+        return rows
+
+    # тот же поиск, но на IndexedHeap: в куче нет устаревших записей, её размер не больше числа вершин
+    def dijkstra_indexed(self, start: str | None = None):
+        start, s, best_cost, time_ms, energy, noise, parent = self.search_setup(start)
+        offsets, targets, travel_ms, factor, edge_noise, keep, alpha, beta, gamma, R_ms = self.search_columns()
+        g = self.graph
+        n = len(g)
+        inf = float("inf")
+
+        heap = IndexedHeap(n)
+        heap.push(s, best_cost[s])
+        push, pop = heap.push, heap.pop
+
+        while heap.items:
+            cost, u = pop()
+
+            t_u, e_u, n_u = time_ms[u], energy[u], noise[u]
+            for k in range(offsets[u], offsets[u + 1]):
+                new_time = t_u + travel_ms[k]
+                if new_time > R_ms:
+                    continue
+
+                v = targets[k]
+                E_new = e_u * factor[k] * keep[v]
+                if E_new <= 0:
+                    continue
+
+                new_noise = n_u + edge_noise[k]
+                new_cost = gamma * new_time + alpha * new_noise + beta * (1.0 / E_new)
+
+                if new_cost < best_cost[v]:
+                    best_cost[v] = new_cost
+                    time_ms[v] = new_time
+                    energy[v] = E_new
+                    noise[v] = new_noise
+                    parent[v] = u
+                    push(v, new_cost)
+
+        reached = (i for i in range(n) if best_cost[i] != inf)
+        best_state = self.collect_states(reached, best_cost, time_ms, energy, noise, parent)
+        self._best_state = best_state
+        self.heap_stats = {"pushes": heap.pushes, "decreases": heap.decreases, "pops": heap.pops, "peak": heap.peak}
+        return best_state
+
+    def collect_states(self, indices, best_cost, time_ms, energy, noise, parent) -> dict:
+        ids = self.graph.ids
+        best_state = {}
+        for i in indices:
+            best_state[ids[i]] = State(
+                cost=best_cost[i],
+                node_id=ids[i],
+                time_ms=time_ms[i],
+                energy=energy[i],
+                noise=noise[i],
+                parent=ids[parent[i]] if parent[i] >= 0 else None,
+            )
+        return best_state
+
+    # поиск только до датчиков: останавливается, когда все датчики сняты с кучи.
+    # с prune_energy не раскрывает состояния, энергия которых ниже минимального порога
+    # оставшихся датчиков (энергия вдоль пути только убывает). без отсечения результат
+    # совпадает с dijkstra(); с отсечением все датчики из dijkstra() находятся с теми же
+    # значениями, но датчик, чей самый дешёвый путь шёл через отсечённую ветку и был ниже
+    # порога, может найтись по более дорогому пути с достаточной энергией
+    def dijkstra_sensors(self, start: str | None = None, prune_energy: bool = True, sink=None):
+        start, s, best_cost, time_ms, energy, noise, parent = self.search_setup(start)
+        offsets, targets, travel_ms, factor, edge_noise, keep, alpha, beta, gamma, R_ms = self.search_columns()
+        g = self.graph
+        n = len(g)
+        sensor, threshold = g.sensor, g.threshold
+
+        # датчики по возрастанию порога; указатель lowest - первый ещё не снятый
+        pending = bytearray(n)
+        by_threshold = sorted((i for i in range(n) if sensor[i]), key=threshold.__getitem__)
+        remaining = 0
+        for i in by_threshold:
+            if threshold[i] <= self.initial_energy:
+                pending[i] = 1
+                remaining += 1
+        lowest = 0
+
+        stats = {"sensors": len(by_threshold), "settled": 0, "unreachable": 0, "popped": 0, "pruned": 0, "stopped_early": False}
+        settled = []
+
+        # датчик пишется в sink в момент снятия с кучи: его метка и метки его предков уже окончательные
+        if sink is not None:
+            ids, index = g.ids, g.index
+            paths = PathCache(lambda nid: ids[parent[index[nid]]] if parent[index[nid]] >= 0 else None)
+            sink.begin(self)
+
+        heap = [(best_cost[s], s)]
+        heappop, heappush = heapq.heappop, heapq.heappush
+
+        while heap and remaining:
+            cost, u = heappop(heap)
+
+            if cost > best_cost[u]:
+                continue
+            stats["popped"] += 1
+
+            if pending[u]:
+                pending[u] = 0
+                remaining -= 1
+                settled.append(u)
+                if sink is not None and energy[u] >= threshold[u] and time_ms[u] <= R_ms:
+                    sink.write({"id": ids[u], "time": time_ms[u], "energy": energy[u], "noise": noise[u], "cost": best_cost[u]}, paths)
+                while lowest < len(by_threshold) and not pending[by_threshold[lowest]]:
+                    lowest += 1
+                if not remaining:
+                    stats["stopped_early"] = bool(heap)
+                    break
+
+            min_threshold = threshold[by_threshold[lowest]] if prune_energy else 0.0
+
+            t_u, e_u, n_u = time_ms[u], energy[u], noise[u]
+            for k in range(offsets[u], offsets[u + 1]):
+                new_time = t_u + travel_ms[k]
+                if new_time > R_ms:
+                    continue
+
+                v = targets[k]
+                E_new = e_u * factor[k] * keep[v]
+                if E_new <= 0:
+                    continue
+
+                new_noise = n_u + edge_noise[k]
+                new_cost = gamma * new_time + alpha * new_noise + beta * (1.0 / E_new)
+
+                if new_cost < best_cost[v]:
+                    best_cost[v] = new_cost
+                    time_ms[v] = new_time
+                    energy[v] = E_new
+                    noise[v] = new_noise
+                    parent[v] = u
+                    # состояние запоминается, чтобы более дорогие пути в v не считались лучшими,
+                    # но дальше не раскрывается
+                    if E_new < min_threshold and not pending[v]:
+                        stats["pruned"] += 1
+                        continue
+                    heappush(heap, (new_cost, v))
+
+        stats["settled"] = len(settled)
+        stats["unreachable"] = stats["sensors"] - len(settled)
+        if sink is not None:
+            sink.end()
+
+        # состояния нужны только датчикам и вершинам на их путях
+        keep_nodes = set()
+        for i in settled:
+            while i >= 0 and i not in keep_nodes:
+                keep_nodes.add(i)
+                i = parent[i]
+        best_state = self.collect_states(sorted(keep_nodes), best_cost, time_ms, energy, noise, parent)
+
+        self._best_state = best_state
+        self.search_stats = stats
+        return best_state
+
+    # исходный вариант на объектах Node/Edge, для сверки результатов
+    def dijkstra_objects(self, start: str | None = None):
+        if start is None:
+            start = self.start
         best_cost = {nid: float("inf") for nid in self.nodes}
         best_state = {}
 
         init_energy = self.initial_energy
         init_cost = self.compute_cost(0.0, 0.0, init_energy)
 
-        best_cost[self.start] = init_cost
-        best_state[self.start] = State(
+        best_cost[start] = init_cost
+        best_state[start] = State(
             cost=init_cost,
-            node_id=self.start,
+            node_id=start,
             time_ms=0.0,
             energy=init_energy,
             noise=0.0,
             parent=None,
         )
 
-        heap = [best_state[self.start]]
+        heap = [best_state[start]]
 
         while heap:
             cur = heapq.heappop(heap)
@@ -164,44 +1563,157 @@ class SignalSystem:
         self._best_state = best_state
         return best_state
 
-    def restore_path(self, node_id: str) -> list[str]:
+    def restore_path(self, node_id: str, best_state: dict | None = None) -> list[str]:
+        if best_state is None:
+            best_state = self._best_state
         path = []
         cur = node_id
         while cur is not None:
             path.append(cur)
-            state = self._best_state.get(cur)
+            state = best_state.get(cur)
             cur = state.parent if state else None
         return list(reversed(path))
 
-    def run(self, output_path: str):
-        best_state = self.dijkstra()
-
-        lines = [f"R = {self.R_ms} ms", "достижимые датчики"]
-        results = []
+    def reachable_sensors(self, best_state: dict, with_paths: bool = True) -> list[dict]:
+        if self.graph is None:
+            self.compile()
+        self.graph.flush()
+        g = self.graph
 
-        for nid, node in sorted(self.nodes.items()):
-            if not node.sensor:
+        rows = []
+        for nid in sorted(g.ids[i] for i in range(len(g)) if g.sensor[i]):
+            i = g.index[nid]
+            state = best_state.get(nid)
+            if state is None or state.cost == float("inf"):
+                continue
+            if state.time_ms > self.R_ms:
                 continue
+            if state.energy < g.threshold[i]:
+                continue
+
+            rows.append({
+                "id": nid,
+                "time": state.time_ms,
+                "energy": state.energy,
+                "noise": state.noise,
+                "cost": state.cost,
+                "path": self.restore_path(nid, best_state) if with_paths else None,
+            })
+        return rows
+
+    def propagate_from(self, start: str) -> list[dict]:
+        return self.reachable_sensors(self.dijkstra(start))
+
+    def batch(self, starts: list[str], processes: int | None = None) -> dict[str, list[dict]]:
+        if self.graph is None:
+            self.compile()
+        self.graph.flush()
+        for start in starts:
+            if start not in self.graph.index:
+                raise KeyError(f"нет вершины {start}")
+
+        if processes == 1 or len(starts) < 2:
+            return {start: self.propagate_from(start) for start in starts}
+
+        chunksize = max(1, len(starts) // (4 * (processes or 4)))
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(self,)) as pool:
+            tables = pool.map(_worker_propagate, starts, chunksize=chunksize)
+            return dict(zip(starts, tables))
+
+    # перебор сетки параметров: граф грузится один раз, а время прохода и затухание рёбер
+    # уже посчитаны в CompiledGraph и от весов не зависят
+    def sweep(self, grid: dict[str, list], start: str | None = None, processes: int | None = None) -> list[dict]:
+        if self.graph is None:
+            self.compile()
+        self.graph.flush()
+        for name in grid:
+            if name not in SWEEP_PARAMS:
+                raise KeyError(f"параметр {name} нельзя перебирать")
+
+        values = [grid.get(name, [getattr(self, name)]) for name in SWEEP_PARAMS]
+        jobs = [(dict(zip(SWEEP_PARAMS, combo)), start) for combo in itertools.product(*values)]
+
+        if processes == 1 or len(jobs) < 2:
+            saved = {name: getattr(self, name) for name in SWEEP_PARAMS}
+            try:
+                return [self.sweep_point(params, start) for params, start in jobs]
+            finally:
+                for name, value in saved.items():
+                    setattr(self, name, value)
+
+        chunksize = max(1, len(jobs) // (4 * (processes or 4)))
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(self,)) as pool:
+            return list(pool.map(_worker_sweep, jobs, chunksize=chunksize))
+
+    def sweep_point(self, params: dict, start: str | None = None) -> dict:
+        for name, value in params.items():
+            setattr(self, name, value)
+        rows = self.reachable_sensors(self.dijkstra(start), with_paths=False)
+        return dict(params, reachable=len(rows), sensors={
+            row["id"]: {"time": row["time"], "energy": row["energy"], "noise": row["noise"], "cost": row["cost"]}
+            for row in rows
+        })
+
+    @staticmethod
+    def write_sweep(results: list[dict], output_path: str):
+        if output_path.endswith(".json"):
+            with open(output_path, "w", encoding="utf-8") as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+            return
+
+        # csv: строка на пару (набор параметров, достижимый датчик); набор без достижимых
+        # датчиков остаётся в таблице одной строкой с пустыми полями датчика
+        with open(output_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow([*SWEEP_PARAMS, "reachable", "sensor", "time", "energy", "noise", "cost"])
+            for result in results:
+                params = [result[name] for name in SWEEP_PARAMS]
+                if not result["sensors"]:
+                    writer.writerow([*params, 0, "", "", "", "", ""])
+                for nid, values in result["sensors"].items():
+                    writer.writerow([*params, result["reachable"], nid, values["time"], values["energy"], values["noise"], values["cost"]])
+
+    # пишет достижимые датчики в sink по одному, пути выписывает общий PathCache
+    def write_sensors(self, best_state: dict, sink):
+        g = self.graph
+        paths = PathCache(lambda nid: best_state[nid].parent)
+        sink.begin(self)
+        for nid in sorted(g.ids[i] for i in range(len(g)) if g.sensor[i]):
             state = best_state.get(nid)
             if state is None or state.cost == float("inf"):
                 continue
             if state.time_ms > self.R_ms:
                 continue
-            if state.energy < node.threshold:
+            if state.energy < g.threshold[g.index[nid]]:
                 continue
+            sink.write({"id": nid, "time": state.time_ms, "energy": state.energy, "noise": state.noise, "cost": state.cost}, paths)
+        sink.end()
+
+    # формат вывода выбирается по расширению: .jsonl, .csv или прежний текст
+    def run(self, output_path: str):
+        best_state = self.dijkstra()
+        with open(output_path, "w", encoding="utf-8", newline="") as f:
+            self.write_sensors(best_state, sink_for(output_path, f, echo=True))
+
+
+_worker_system: SignalSystem | None = None
+
+
+def _init_worker(system: SignalSystem):
+    global _worker_system
+    _worker_system = system
 
-            path_str = " → ".join(self.restore_path(nid))
-            results.append(f"{nid}:\ntime = {state.time_ms}\nenergy = {state.energy}\nnoise = {state.noise}\ncost = {state.cost}\npath = {path_str}")
 
-        lines.append("\n".join(results) if results else "нет достижимых датчиков")
+def _worker_propagate(start: str) -> list[dict]:
+    return _worker_system.propagate_from(start)
 
-        result = "\n".join(lines)
-        print(result)
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(result)
+def _worker_sweep(job: tuple[dict, str | None]) -> dict:
+    params, start = job
+    return _worker_system.sweep_point(params, start)
 
 
-system = SignalSystem()
-system.load_from_json("20_Djikstra/data.json")
-system.run("20_Djikstra/result.txt")
+if __name__ == "__main__":
+    system = SignalSystem()
+    system.load_from_json("20_Djikstra/data.json")
+    system.run("20_Djikstra/result.txt")
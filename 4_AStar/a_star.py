@@ -1,4 +1,11 @@
 import heapq
+import json
+import math
+import struct
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
 class Point:
     def __init__(self, name, x, y):
@@ -7,64 +14,670 @@ class Point:
         self.y = y
 
 
+# вершины хранятся по номерам, координаты - в двух плоских массивах;
+# Point создаётся только по запросу, для совместимости со старым кодом
+class NodeStore:
+    def __init__(self):
+        self.names = [] # index -> name
+        self.index = {} # name -> index
+        self.xs = array("d")
+        self.ys = array("d")
+
+    def add(self, name, x=None, y=None):
+        i = self.index.get(name)
+        if i is None:
+            i = len(self.names)
+            self.index[name] = i
+            self.names.append(name)
+            self.xs.append(math.nan)
+            self.ys.append(math.nan)
+        if x is not None and y is not None:
+            self.xs[i] = x
+            self.ys[i] = y
+        return i
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, name):
+        i = self.index[name]
+        return Point(name, self.xs[i], self.ys[i])
+
+
+# равномерная сетка: ближайшая вершина ищется по кольцам ячеек вокруг точки
+class GridIndex:
+    def __init__(self, store: NodeStore, cell=None):
+        points = [i for i in range(len(store)) if not math.isnan(store.xs[i])]
+        self.store = store
+        self.cells = {}
+        if not points:
+            self.cell = 1.0
+            return
+
+        min_x = min(store.xs[i] for i in points)
+        max_x = max(store.xs[i] for i in points)
+        min_y = min(store.ys[i] for i in points)
+        max_y = max(store.ys[i] for i in points)
+        self.box = (min_x, max_x, min_y, max_y)
+        if cell is None:
+            # в среднем пара точек на ячейку, но не мельче span / sqrt(n):
+            # если все точки на одной прямой, площадь рамки нулевая
+            span = max(max_x - min_x, max_y - min_y)
+            if span == 0:
+                cell = 1.0
+            else:
+                area = (max_x - min_x) * (max_y - min_y)
+                cell = max(math.sqrt(2 * area / len(points)), span / math.sqrt(len(points)))
+        self.cell = cell
+
+        for i in points:
+            key = (int(store.xs[i] // cell), int(store.ys[i] // cell))
+            self.cells.setdefault(key, []).append(i)
+        keys = list(self.cells)
+        self.min_cx = min(k[0] for k in keys)
+        self.max_cx = max(k[0] for k in keys)
+        self.min_cy = min(k[1] for k in keys)
+        self.max_cy = max(k[1] for k in keys)
+
+    def nearest(self, x, y):
+        if not self.cells:
+            return None
+        xs, ys, cell = self.store.xs, self.store.ys, self.cell
+        # кольца считаются от проекции запроса на рамку точек: для точки p в рамке
+        # |p - q|^2 >= |p - proj|^2 + |q - proj|^2, так что дальний запрос не обходит пустые кольца
+        min_x, max_x, min_y, max_y = self.box
+        px, py = min(max(x, min_x), max_x), min(max(y, min_y), max_y)
+        outside = (x - px) ** 2 + (y - py) ** 2
+        cx, cy = int(px // cell), int(py // cell)
+        # за пределами этого радиуса колец ячеек не осталось
+        max_ring = max(cx - self.min_cx, self.max_cx - cx, cy - self.min_cy, self.max_cy - cy)
+
+        best, best_d = None, math.inf
+        ring = 0
+        while ring <= max_ring:
+            # любая точка в кольце ring не ближе (ring - 1) * cell к проекции
+            if best is not None and ring > 1 and outside + ((ring - 1) * cell) ** 2 > best_d ** 2:
+                break
+            for gx in range(max(cx - ring, self.min_cx), min(cx + ring, self.max_cx) + 1):
+                if abs(gx - cx) == ring:
+                    column = range(max(cy - ring, self.min_cy), min(cy + ring, self.max_cy) + 1)
+                else:
+                    column = (cy - ring, cy + ring)
+                for gy in column:
+                    for i in self.cells.get((gx, gy), ()):
+                        d = math.hypot(xs[i] - x, ys[i] - y)
+                        if d < best_d:
+                            best, best_d = i, d
+            ring += 1
+        return self.store.names[best]
+
+
+LANDMARKS_MAGIC = b"ALTLMK01"
+
+
+# таблицы ALT: для каждого ориентира L расстояния d(L, v) и d(v, L) по номерам вершин
+class Landmarks:
+    def __init__(self, names, landmarks, forward, backward):
+        self.names = names # имена вершин в порядке номеров, для проверки при загрузке
+        self.landmarks = landmarks # имена ориентиров
+        self.forward = forward # list[array]: d(L, v)
+        self.backward = backward # list[array]: d(v, L)
+
+    @classmethod
+    def build(cls, graph, k=8):
+        n = len(graph.nodes)
+        names = list(graph.nodes.names)
+        landmarks, forward, backward = [], [], []
+        if n == 0:
+            return cls(names, landmarks, forward, backward)
+
+        # выбор самых удалённых: следующий ориентир - вершина, дальше всех от уже выбранных
+        nearest = array("d", [math.inf]) * n
+        candidate = names[0]
+        for _ in range(min(k, n)):
+            landmarks.append(candidate)
+            forward.append(graph.distances_from(candidate, graph.graph))
+            backward.append(graph.distances_from(candidate, graph.reverse))
+
+            best, best_d = None, -1.0
+            for i in range(n):
+                d = min(forward[-1][i], backward[-1][i])
+                if d < nearest[i]:
+                    nearest[i] = d
+                if nearest[i] != math.inf and nearest[i] > best_d and names[i] not in landmarks:
+                    best, best_d = names[i], nearest[i]
+            if best is None:
+                break
+            candidate = best
+        return cls(names, landmarks, forward, backward)
+
+    def save(self, path):
+        head = json.dumps({"names": self.names, "landmarks": self.landmarks}, ensure_ascii=False).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(LANDMARKS_MAGIC)
+            f.write(struct.pack("<Q", len(head)))
+            f.write(head)
+            for table in self.forward + self.backward:
+                table.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            if f.read(len(LANDMARKS_MAGIC)) != LANDMARKS_MAGIC:
+                raise ValueError(f"{path}: не таблица ориентиров")
+            (head_len,) = struct.unpack("<Q", f.read(8))
+            head = json.loads(f.read(head_len))
+            n, k = len(head["names"]), len(head["landmarks"])
+            tables = []
+            for _ in range(2 * k):
+                table = array("d")
+                table.fromfile(f, n)
+                tables.append(table)
+        return cls(head["names"], head["landmarks"], tables[:k], tables[k:])
+
+    # нижняя граница d(i, t) по неравенству треугольника. вершина, добавленная после
+    # построения таблиц, ещё без рёбер (новое ребро сбрасывает ориентиры), для неё граница 0
+    def bound(self, i, t):
+        if i >= len(self.names) or t >= len(self.names):
+            return 0.0
+        best = 0.0
+        for d_from, d_to in zip(self.forward, self.backward):
+            a = d_to[i] - d_to[t] # d(i, L) - d(t, L)
+            b = d_from[t] - d_from[i] # d(L, t) - d(L, i)
+            if a > best:
+                best = a
+            if b > best:
+                best = b
+        return best
+
+
+# кэш маршрутов: LRU по суммарной длине сохранённых путей. любой отрезок оптимального
+# пути тоже оптимален, поэтому запрос, оба конца которого лежат на сохранённом пути
+# в нужном порядке, отвечается без поиска
+class RouteCache:
+    def __init__(self, max_nodes=100000):
+        self.max_nodes = max_nodes
+        # (start, end) -> (path, prefix, positions); путь хранится кортежем, наружу отдаётся копия
+        self.entries = OrderedDict()
+        self.on_path = {} # вершина -> множество ключей путей, на которых она лежит
+        self.size = 0
+        self.version = 0
+        self.hits = 0
+        self.sub_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def clear(self):
+        self.entries.clear()
+        self.on_path.clear()
+        self.size = 0
+
+    def get(self, start, end):
+        key = (start, end)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            path, prefix, _ = entry
+            return (list(path), prefix[-1]) if path else (None, float("inf"))
+
+        for other in self.on_path.get(start, ()):
+            path, prefix, positions = self.entries[other]
+            i, j = positions[start], positions.get(end, -1)
+            if i <= j:
+                self.entries.move_to_end(other)
+                self.sub_hits += 1
+                return list(path[i:j + 1]), prefix[j] - prefix[i]
+
+        self.misses += 1
+        return None
+
+    def put(self, start, end, path, distance, graph):
+        key = (start, end)
+        if key in self.entries:
+            return
+        if path is None:
+            entry = (None, array("d", [distance]), {})
+        else:
+            prefix = array("d", [0.0])
+            for a, b in zip(path, path[1:]):
+                prefix.append(prefix[-1] + min(length for neighbor, length in graph[a] if neighbor == b))
+            entry = (tuple(path), prefix, {node: i for i, node in enumerate(path)})
+            for node in path:
+                self.on_path.setdefault(node, set()).add(key)
+
+        self.entries[key] = entry
+        self.size += len(entry[1])
+        while self.size > self.max_nodes and len(self.entries) > 1:
+            self.evict()
+
+    def evict(self):
+        key, (path, prefix, _) = self.entries.popitem(last=False)
+        self.size -= len(prefix)
+        self.evictions += 1
+        for node in path or ():
+            keys = self.on_path[node]
+            keys.discard(key)
+            if not keys:
+                del self.on_path[node]
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "sub_hits": self.sub_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "size": self.size,
+        }
+
+
+# счётчики одного поиска; тот же формат JSON отдаёт SignalSystem.dijkstra в 3_Djikstra.
+# trace - порядок раскрытия вершин: [вершина, ключ кучи, расстояние]
+class SearchStats:
+    def __init__(self, engine="", trace=False):
+        self.engine = engine
+        self.expanded = 0
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+        self.pruned = 0
+        self.peak_heap = 0
+        self.heuristic_seconds = 0.0 # время в эвристике (у Дейкстры эвристики нет, всегда 0)
+        self.total_seconds = 0.0
+        self.trace = [] if trace else None
+
+    def as_dict(self):
+        return {name: value for name, value in vars(self).items() if value is not None}
+
+    def to_json(self, path=None):
+        text = json.dumps(self.as_dict(), ensure_ascii=False)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
+
+
 class Graph:
     def __init__(self):
-        self.nodes = {} # name -> Point
+        self.nodes = NodeStore() # name -> Point
         self.graph = {} # name -> list[tuple]
-    
-    def add_node(self, node_id):
+        self.reverse = {} # name -> list[tuple] входящих рёбер
+        self.spatial = None
+        self.h_cache = {} # (вид, направление, index цели) -> array с эвристикой
+        self.h_cache_size = 8
+        self.landmarks = None
+        self.version = 0 # растёт при любом изменении графа
+        self.route_cache = RouteCache()
+        self.frozen = False # собран GraphBuilder, списки смежности - кортежи
+
+    def check_mutable(self):
+        if self.frozen:
+            raise RuntimeError("граф заморожен, изменения только через GraphBuilder")
+
+    def add_node(self, node_id, x=None, y=None):
+        self.check_mutable()
+        self.version += 1
         if node_id not in self.nodes:
-            self.nodes[node_id] = Point(node_id)
             self.graph[node_id] = []
-    
+            self.reverse[node_id] = []
+        self.nodes.add(node_id, x, y)
+        if x is not None:
+            self.spatial = None
+            self.h_cache.clear()
+
     def add_edge(self, from_id, to_id, length, direction):
+        self.check_mutable()
         self.add_node(from_id)
         self.add_node(to_id)
+        self.version += 1
+        # новое ребро может укоротить пути, таблицы ориентиров перестают быть нижней границей
+        if self.landmarks is not None:
+            self.landmarks = None
+            self.h_cache.clear()
         self.graph[from_id].append((to_id, length))
+        self.reverse[to_id].append((from_id, length))
 
         if not direction:
             self.graph[to_id].append((from_id, length))
+            self.reverse[from_id].append((to_id, length))
 
-    def a_star(self, start, end):
+    def nearest(self, x, y):
+        if self.spatial is None:
+            self.spatial = GridIndex(self.nodes)
+        return self.spatial.nearest(x, y)
+
+    # a_star через кэш маршрутов; кэш сбрасывается, если граф изменился после заполнения
+    def route(self, start, end, heuristic="euclid"):
+        cache = self.route_cache
+        if cache.version != self.version:
+            cache.clear()
+            cache.version = self.version
+
+        found = cache.get(start, end)
+        if found is not None:
+            return found
+
+        path, distance = self.a_star(start, end, heuristic)
+        cache.put(start, end, path, distance, self.graph)
+        return path, distance
+
+    def a_star(self, start, end, heuristic="euclid", stats=None):
+        # со сбором статистики работает отдельный цикл, основной остаётся без проверок
+        if stats is not None:
+            return self.a_star_traced(start, end, heuristic, stats)
         queue = [(0, start)]
 
         route = {}
-        distance = {point: float("inf") for point in self.nodes}
-        distance[start] = 0
-        h_distances = {point: float("inf") for point in self.nodes}
-        h_distances[start] = 0
+        # расстояния заводятся только для встреченных вершин
+        distance = {start: 0}
+        inf = float("inf")
+
+        index = self.nodes.index
+        h = self.heuristic_table(end, heuristic)
+        expanded = 0
 
         while queue:
             h_distance, current_point = heapq.heappop(queue)
 
             if current_point == end:
+                self.last_expanded = {"forward": expanded, "backward": 0}
                 return self.reconstuct_path(route, end), distance[end]
-            
+            # устаревшая запись: вершину уже достали с меньшим расстоянием
+            if h_distance > distance[current_point] + h(index[current_point]):
+                continue
+            expanded += 1
+
             for neighbor, length in self.graph[current_point]:
                 new_distance = distance[current_point] + length
 
-                if new_distance < distance[neighbor]:
+                if new_distance < distance.get(neighbor, inf):
+                    h_neighbor = h(index[neighbor])
+                    # бесконечная оценка: из neighbor до цели не добраться
+                    if h_neighbor == inf:
+                        continue
                     route[neighbor] = current_point
                     distance[neighbor] = new_distance
-                    new_h_distance = new_distance + self.heuristic(neighbor, end)
-                    h_distances[neighbor] = new_h_distance
+                    new_h_distance = new_distance + h_neighbor
                     heapq.heappush(queue, (new_h_distance, neighbor))
-        
-        return None, float("inf") 
+
+        self.last_expanded = {"forward": expanded, "backward": 0}
+        return None, float("inf")
+
+    def a_star_traced(self, start, end, heuristic, stats):
+        clock = time.perf_counter
+        started = clock()
+        stats.engine = stats.engine or "a_star"
+        queue = [(0, start)]
+        route = {}
+        distance = {start: 0}
+        inf = float("inf")
+
+        index = self.nodes.index
+        h_table = self.heuristic_table(end, heuristic)
+
+        def h(i):
+            before = clock()
+            value = h_table(i)
+            stats.heuristic_seconds += clock() - before
+            return value
+
+        trace = stats.trace
+        stats.pushes += 1
+        stats.peak_heap = max(stats.peak_heap, 1)
+        result = None, inf
+
+        while queue:
+            h_distance, current_point = heapq.heappop(queue)
+            stats.pops += 1
+
+            if current_point == end:
+                result = self.reconstuct_path(route, end), distance[end]
+                break
+            if h_distance > distance[current_point] + h(index[current_point]):
+                stats.stale_pops += 1
+                continue
+            stats.expanded += 1
+            if trace is not None:
+                trace.append([current_point, h_distance, distance[current_point]])
+
+            for neighbor, length in self.graph[current_point]:
+                new_distance = distance[current_point] + length
+
+                if new_distance < distance.get(neighbor, inf):
+                    h_neighbor = h(index[neighbor])
+                    if h_neighbor == inf:
+                        stats.pruned += 1
+                        continue
+                    route[neighbor] = current_point
+                    distance[neighbor] = new_distance
+                    heapq.heappush(queue, (new_distance + h_neighbor, neighbor))
+                    stats.pushes += 1
+                    if len(queue) > stats.peak_heap:
+                        stats.peak_heap = len(queue)
+
+        self.last_expanded = {"forward": stats.expanded, "backward": 0}
+        stats.total_seconds += clock() - started
+        return result
+
+    # двунаправленный A* со средними потенциалами p_f = (h(v, end) - h(start, v)) / 2, p_r = -p_f.
+    # обе стороны тогда работают на одних и тех же неотрицательных приведённых весах,
+    # и поиск можно остановить, когда top_f + top_r >= mu. эвристика должна быть согласованной
+    def a_star_bidirectional(self, start, end, heuristic="euclid"):
+        inf = float("inf")
+        index = self.nodes.index
+        h_end = self.heuristic_table(end, heuristic)
+        h_start = self.heuristic_table(start, heuristic, reverse=True)
+
+        def p_f(node):
+            i = index[node]
+            return (h_end(i) - h_start(i)) / 2
+
+        dist_f, dist_r = {start: 0}, {end: 0}
+        route_f, route_r = {}, {}
+        closed_f, closed_r = set(), set()
+        queue_f, queue_r = [(p_f(start), start)], [(-p_f(end), end)]
+        expanded = {"forward": 0, "backward": 0}
+
+        mu = 0 if start == end else inf
+        meet = start if start == end else None
+
+        while queue_f and queue_r:
+            if queue_f[0][0] + queue_r[0][0] >= mu:
+                break
+
+            forward = queue_f[0][0] <= queue_r[0][0]
+            if forward:
+                queue, dist, other, route, closed, edges, sign, h_far = queue_f, dist_f, dist_r, route_f, closed_f, self.graph, 1, h_end
+            else:
+                queue, dist, other, route, closed, edges, sign, h_far = queue_r, dist_r, dist_f, route_r, closed_r, self.reverse, -1, h_start
+
+            key, current_point = heapq.heappop(queue)
+            if current_point in closed:
+                continue
+            closed.add(current_point)
+            expanded["forward" if forward else "backward"] += 1
+
+            for neighbor, length in edges[current_point]:
+                new_distance = dist[current_point] + length
+                if new_distance < dist.get(neighbor, inf):
+                    # вершина, не связанная с другим концом, в поиске не нужна
+                    if h_far(index[neighbor]) == inf:
+                        continue
+                    dist[neighbor] = new_distance
+                    route[neighbor] = current_point
+                    heapq.heappush(queue, (new_distance + sign * p_f(neighbor), neighbor))
+
+                    if neighbor in other and new_distance + other[neighbor] < mu:
+                        mu = new_distance + other[neighbor]
+                        meet = neighbor
+
+        self.last_expanded = expanded
+        if meet is None:
+            return None, inf
+
+        path = self.reconstuct_path(route_f, meet)
+        current = route_r.get(meet)
+        while current is not None:
+            path.append(current)
+            current = route_r.get(current)
+        return path, mu
 
 
     def heuristic(self, neighbor: str, end: str):
-        import math
-        neighbor = self.nodes[neighbor]
-        end = self.nodes[end]
-        return math.hypot(end.x - neighbor.x, end.y - neighbor.y)
+        return self.heuristic_table(end)(self.nodes.index[neighbor])
+
+    # эвристика как функция от номера вершины: нижняя граница d(i, end),
+    # а с reverse=True - d(end, i). значения кэшируются на цель.
+    # heuristic: "euclid" - прямое расстояние по координатам, "alt" - ориентиры
+    def heuristic_table(self, end: str, heuristic="euclid", reverse=False):
+        target = self.nodes.index[end]
+        key = (heuristic, reverse and heuristic != "euclid", target)
+        values = self.h_cache.get(key)
+        if values is None:
+            if len(self.h_cache) >= self.h_cache_size:
+                self.h_cache.pop(next(iter(self.h_cache)))
+            values = array("d", [-1.0]) * len(self.nodes)
+            self.h_cache[key] = values
+        elif len(values) < len(self.nodes):
+            values.extend(array("d", [-1.0]) * (len(self.nodes) - len(values)))
+
+        if heuristic == "alt":
+            if self.landmarks is None:
+                raise ValueError("ориентиры не построены, нужен build_landmarks() или load_landmarks()")
+            bound = self.landmarks.bound
+
+            def h(i):
+                value = values[i]
+                if value < 0:
+                    value = bound(target, i) if reverse else bound(i, target)
+                    values[i] = value
+                return value
+
+            return h
+
+        xs, ys = self.nodes.xs, self.nodes.ys
+        tx, ty = xs[target], ys[target]
+        hypot = math.hypot
+
+        def h(i):
+            value = values[i]
+            if value < 0:
+                value = hypot(tx - xs[i], ty - ys[i])
+                # без координат эвристика 0, так она остаётся допустимой
+                if value != value:
+                    value = 0.0
+                values[i] = value
+            return value
+
+        return h
+
+    def build_landmarks(self, k=8):
+        self.landmarks = Landmarks.build(self, k)
+        self.h_cache.clear()
+        return self.landmarks
+
+    def save_landmarks(self, path):
+        self.landmarks.save(path)
+
+    def load_landmarks(self, path):
+        landmarks = Landmarks.load(path)
+        if landmarks.names != self.nodes.names:
+            raise ValueError(f"{path}: таблицы построены для другого графа")
+        self.landmarks = landmarks
+        self.h_cache.clear()
+        return landmarks
+
+    # матрица расстояний: один Дейкстра на источник, который останавливается, когда сняты все цели.
+    # источники раздаются по процессам; строки - array("d"), inf для недостижимых
+    def route_matrix(self, origins, destinations, processes=None, with_paths=False):
+        for name in list(origins) + list(destinations):
+            if name not in self.nodes:
+                raise KeyError(f"нет вершины {name}")
+
+        jobs = [(origin, destinations, with_paths) for origin in origins]
+        if processes == 1 or len(origins) < 2:
+            rows = [self.one_to_many(*job) for job in jobs]
+        else:
+            chunksize = max(1, len(jobs) // (4 * (processes or 4)))
+            with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(self,)) as pool:
+                rows = list(pool.map(_worker_one_to_many, jobs, chunksize=chunksize))
+
+        matrix = [row for row, _ in rows]
+        if not with_paths:
+            return matrix
+        return matrix, [paths for _, paths in rows]
+
+    def one_to_many(self, origin, destinations, with_paths=False):
+        inf = float("inf")
+        targets = set(destinations)
+        distance = {origin: 0}
+        route = {}
+        queue = [(0, origin)]
+        closed = set()
+
+        while queue and targets:
+            d, current_point = heapq.heappop(queue)
+            if current_point in closed:
+                continue
+            closed.add(current_point)
+            targets.discard(current_point)
+
+            for neighbor, length in self.graph[current_point]:
+                new_distance = d + length
+                if new_distance < distance.get(neighbor, inf):
+                    distance[neighbor] = new_distance
+                    route[neighbor] = current_point
+                    heapq.heappush(queue, (new_distance, neighbor))
+
+        row = array("d", (distance.get(name, inf) if name in closed else inf for name in destinations))
+        paths = None
+        if with_paths:
+            paths = [self.reconstuct_path(route, name) if name in closed else None for name in destinations]
+        return row, paths
+
+    # расстояния от source до всех вершин по edges (graph или reverse), по номерам вершин
+    def distances_from(self, source, edges):
+        index = self.nodes.index
+        dist = array("d", [math.inf]) * len(self.nodes)
+        dist[index[source]] = 0.0
+        queue = [(0.0, source)]
+        while queue:
+            d, current_point = heapq.heappop(queue)
+            if d > dist[index[current_point]]:
+                continue
+            for neighbor, length in edges[current_point]:
+                new_distance = d + length
+                j = index[neighbor]
+                if new_distance < dist[j]:
+                    dist[j] = new_distance
+                    heapq.heappush(queue, (new_distance, neighbor))
+        return dist
 
 
     def reconstuct_path(self, route, end):
         path = []
         current = end
-        while current:
+        while current is not None:
             path.append(current)
-            current = route[current]
+            current = route.get(current)
         path.reverse()
-        return path
\ No newline at end of file
+        return path
+
+
+_worker_graph = None
+
+
+def _init_worker(graph):
+    global _worker_graph
+    _worker_graph = graph
+
+
+def _worker_one_to_many(job):
+    return _worker_graph.one_to_many(*job)
@@ -0,0 +1,81 @@
+import argparse
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+
+from a_star import Graph
+from builder import GraphBuilder
+
+
+# случайные вершины на плоскости и рёбра к соседям по номеру, длина не меньше расстояния
+def generate_rows(n, degree=4, seed=1):
+    rnd = random.Random(seed)
+    nodes = [(f"v{i}", rnd.uniform(0, 1000), rnd.uniform(0, 1000)) for i in range(n)]
+    edges = []
+    for i in range(n):
+        for _ in range(degree):
+            j = (i + rnd.randrange(1, 50)) % n
+            (_, x1, y1), (_, x2, y2) = nodes[i], nodes[j]
+            length = ((x1 - x2) ** 2 + (y1 - y2) ** 2) ** 0.5 * rnd.uniform(1.0, 1.3)
+            edges.append((f"v{i}", f"v{j}", length, rnd.random() < 0.2))
+    return nodes, edges
+
+
+def timed(title, edges, action):
+    started = time.perf_counter()
+    result = action()
+    seconds = time.perf_counter() - started
+    print(f"  {title:<22} {seconds:7.2f} s, {edges / seconds:12,.0f} edges/sec")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--nodes", type=int, nargs="+", default=[100000, 500000])
+    parser.add_argument("-d", "--degree", type=int, default=4)
+    args = parser.parse_args()
+
+    for n in args.nodes:
+        nodes, edges = generate_rows(n, args.degree)
+        m = len(edges)
+        print(f"n = {n}, edges = {m}")
+
+        def by_add_edge():
+            graph = Graph()
+            for name, x, y in nodes:
+                graph.add_node(name, x, y)
+            for from_id, to_id, length, direction in edges:
+                graph.add_edge(from_id, to_id, length, direction)
+            return graph
+
+        slow = timed("add_edge", m, by_add_edge)
+        fast = timed("builder", m, lambda: GraphBuilder().add_nodes(nodes).add_edges(edges).build())
+        assert {k: sorted(v) for k, v in slow.graph.items()} == {k: sorted(v) for k, v in fast.graph.items()}
+
+        with tempfile.TemporaryDirectory() as folder:
+            nodes_csv = os.path.join(folder, "nodes.csv")
+            edges_csv = os.path.join(folder, "edges.csv")
+            with open(nodes_csv, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["id", "x", "y"])
+                writer.writerows(nodes)
+            with open(edges_csv, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["from", "to", "length", "direction"])
+                writer.writerows((a, b, length, int(d)) for a, b, length, d in edges)
+
+            edges_json = os.path.join(folder, "edges.json")
+            with open(edges_json, "w", encoding="utf-8") as f:
+                json.dump({"nodes": nodes, "edges": edges}, f)
+
+            edges_bin = os.path.join(folder, "edges.bin")
+            GraphBuilder().add_nodes(nodes).add_edges(edges).save_binary(edges_bin)
+
+            timed("csv", m, lambda: GraphBuilder().read_csv(edges_csv, nodes_csv).build())
+            timed("json", m, lambda: GraphBuilder().read_json(edges_json).build())
+            builder = GraphBuilder()
+            timed("binary", m, lambda: builder.read_binary(edges_bin).build())
+            print(f"  build only             {builder.stats['seconds']:7.2f} s, {builder.stats['edges_per_sec']:12,.0f} edges/sec")
@@ -0,0 +1,77 @@
+import argparse
+import math
+import random
+import sys
+import time
+import tracemalloc
+
+from a_star import Graph
+from contraction import ContractionHierarchy
+
+
+# случайный геометрический граф: каждая вершина связана с несколькими ближайшими соседями,
+# длина ребра не меньше расстояния по прямой, чтобы евклидова эвристика оставалась допустимой
+def generate_graph(n, degree=3, seed=1):
+    rnd = random.Random(seed)
+    graph = Graph()
+    points = [(rnd.uniform(0, 1000), rnd.uniform(0, 1000)) for _ in range(n)]
+    for i, (x, y) in enumerate(points):
+        graph.add_node(f"v{i}", x, y)
+
+    cell = 1000 / max(1, int(math.sqrt(n / 4)))
+    cells = {}
+    for i, (x, y) in enumerate(points):
+        cells.setdefault((int(x // cell), int(y // cell)), []).append(i)
+
+    for i, (x, y) in enumerate(points):
+        cx, cy = int(x // cell), int(y // cell)
+        near = [j for dx in (-1, 0, 1) for dy in (-1, 0, 1) for j in cells.get((cx + dx, cy + dy), ()) if j != i]
+        near.sort(key=lambda j: math.hypot(points[j][0] - x, points[j][1] - y))
+        for j in near[:degree]:
+            length = math.hypot(points[j][0] - x, points[j][1] - y) * rnd.uniform(1.0, 1.3)
+            graph.add_edge(f"v{i}", f"v{j}", length, rnd.random() < 0.2)
+    return graph
+
+
+def size_of_ch(ch):
+    arrays = [ch.rank, ch.up_offsets, ch.up_targets, ch.up_weights, ch.down_offsets, ch.down_targets, ch.down_weights]
+    return sum(a.itemsize * len(a) for a in arrays) + sys.getsizeof(ch.middle) + sys.getsizeof(ch.index)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--nodes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("-q", "--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    for n in args.nodes:
+        graph = generate_graph(n)
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        ch = ContractionHierarchy.build(graph)
+        build_seconds = time.perf_counter() - started
+        build_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        rnd = random.Random(2)
+        pairs = [(f"v{rnd.randrange(n)}", f"v{rnd.randrange(n)}") for _ in range(args.queries)]
+
+        started = time.perf_counter()
+        expanded = 0
+        for start, end in pairs:
+            graph.a_star(start, end)
+            expanded += graph.last_expanded["forward"]
+        a_star_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        settled = 0
+        for start, end in pairs:
+            ch.query(start, end)
+            settled += ch.last_settled
+        ch_seconds = time.perf_counter() - started
+
+        print(f"n = {n}: build {build_seconds:.2f} s, peak {build_peak / 2**20:.1f} MB, "
+              f"ch size {size_of_ch(ch) / 2**20:.1f} MB, shortcuts {len(ch.middle)}")
+        print(f"  a_star   {a_star_seconds / len(pairs) * 1000:8.3f} ms/query, expanded {expanded / len(pairs):.0f}")
+        print(f"  ch query {ch_seconds / len(pairs) * 1000:8.3f} ms/query, settled {settled / len(pairs):.0f}")
@@ -0,0 +1,232 @@
+import csv
+import json
+import math
+import struct
+import time
+from array import array
+from collections import Counter
+from collections.abc import Mapping
+from itertools import accumulate, compress
+from operator import itemgetter
+
+from a_star import Graph
+
+
+EDGES_MAGIC = b"EDGELST1"
+TWO_WAY = bytes.maketrans(b"\x00\x01", b"\x01\x00")
+
+
+# имя -> номер; новое имя получает номер при первом обращении,
+# так что поиск по уже известным именам целиком идёт в C через map
+class NodeIndex(dict):
+    def __init__(self, builder):
+        super().__init__()
+        self.builder = builder
+
+    def __missing__(self, name):
+        i = len(self)
+        self[name] = i
+        self.builder.names.append(name)
+        self.builder.xs.append(math.nan)
+        self.builder.ys.append(math.nan)
+        return i
+
+
+# замороженная смежность в CSR: offsets по номерам вершин, соседи и длины рёбер подряд.
+# раскладка откладывается до первого обращения: обратная смежность нужна только
+# двунаправленному поиску и ориентирам, и build() за неё не платит.
+# соседи лежат именами (ссылками на те же строки), поэтому пары (сосед, длина),
+# которые ждут алгоритмы Graph, - это zip двух срезов, и нигде не запоминаются
+class FrozenAdjacency(Mapping):
+    def __init__(self, names, index, heads, tails, lengths):
+        self.names = names
+        self.index = index
+        self.edges = (heads, tails, lengths) # рёбра по номерам вершин до раскладки
+        self.offsets = None
+        self.targets = None
+        self.lengths = None
+
+    # сортировка подсчётом по началу ребра, как в CompiledGraph.build из 3_Djikstra:
+    # степени дают offsets, и каждое ребро сразу пишется в свой слот
+    def layout(self):
+        heads, tails, lengths = self.edges
+        degree = Counter(heads)
+        offsets = array("l", accumulate(map(degree.__getitem__, range(len(self.names))), initial=0))
+        fill = offsets[:-1]
+        targets = array("l", [0]) * len(heads)
+        weights = array("d", [0.0]) * len(heads)
+        for head, tail, length in zip(heads, tails, lengths):
+            slot = fill[head]
+            fill[head] = slot + 1
+            targets[slot] = tail
+            weights[slot] = length
+        self.offsets = offsets
+        self.targets = list(map(self.names.__getitem__, targets))
+        self.lengths = weights
+        self.edges = None
+
+    def __getitem__(self, name):
+        if self.offsets is None:
+            self.layout()
+        i = self.index[name]
+        a, b = self.offsets[i], self.offsets[i + 1]
+        return zip(self.targets[a:b], self.lengths[a:b])
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+
+# пакетная сборка графа: вершины нумеруются один раз, рёбра копятся в плоских массивах,
+# смежность раскладывается в CSR по заранее посчитанным степеням
+class GraphBuilder:
+    def __init__(self):
+        self.names = []
+        self.index = NodeIndex(self)
+        self.xs = array("d")
+        self.ys = array("d")
+        self.sources = array("l")
+        self.targets = array("l")
+        self.lengths = array("d")
+        self.one_way = bytearray() # 1 - только from -> to, как direction в Graph.add_edge
+        self.stats = {}
+
+    def add_nodes(self, rows):
+        index = self.index
+        for name, x, y in rows:
+            i = index[name]
+            self.xs[i] = float(x)
+            self.ys[i] = float(y)
+        return self
+
+    def add_edges(self, rows):
+        rows = rows if isinstance(rows, list) else list(rows)
+        node = self.index.__getitem__
+        self.sources.extend(map(node, map(itemgetter(0), rows)))
+        self.targets.extend(map(node, map(itemgetter(1), rows)))
+        self.lengths.extend(map(float, map(itemgetter(2), rows)))
+        self.one_way.extend(map(bool, map(itemgetter(3), rows)))
+        return self
+
+    # csv с заголовком: id,x,y для вершин и from,to,length,direction для рёбер
+    def read_csv(self, edges_path, nodes_path=None):
+        if nodes_path is not None:
+            with open(nodes_path, newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                head = next(reader)
+                a, b, c = (head.index(name) for name in ("id", "x", "y"))
+                self.add_nodes((row[a], row[b], row[c]) for row in reader)
+
+        with open(edges_path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            head = next(reader)
+            a, b, c = (head.index(name) for name in ("from", "to", "length"))
+            d = head.index("direction") if "direction" in head else -1
+            self.add_edges(
+                (row[a], row[b], row[c], d >= 0 and row[d].strip().lower() in ("1", "true", "yes"))
+                for row in reader
+            )
+        return self
+
+    # {"nodes": [{"id", "x", "y"}], "edges": [{"from", "to", "length", "direction"}]},
+    # вершины и рёбра можно давать и списками [id, x, y] / [from, to, length, direction]
+    def read_json(self, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        self.add_nodes(
+            (item["id"], item["x"], item["y"]) if isinstance(item, dict) else item
+            for item in data.get("nodes", ())
+        )
+        self.add_edges(
+            (item["from"], item["to"], item["length"], item.get("direction", False)) if isinstance(item, dict) else item
+            for item in data.get("edges", ())
+        )
+        return self
+
+    def save_binary(self, path):
+        head = json.dumps(self.names, ensure_ascii=False).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(EDGES_MAGIC)
+            f.write(struct.pack("<QQQ", len(head), len(self.names), len(self.sources)))
+            f.write(head)
+            # номера вершин всегда пишутся 8-байтными, как CACHE_COLUMNS в 3_Djikstra,
+            # чтобы файл не зависел от размера long на платформе
+            for column in (self.xs, self.ys, self.sources, self.targets, self.lengths):
+                if column.typecode == "l" and column.itemsize != 8:
+                    column = array("q", column)
+                column.tofile(f)
+            f.write(self.one_way)
+
+    def read_binary(self, path):
+        with open(path, "rb") as f:
+            if f.read(len(EDGES_MAGIC)) != EDGES_MAGIC:
+                raise ValueError(f"{path}: не бинарный список рёбер")
+            head_len, n, m = struct.unpack("<QQQ", f.read(24))
+            names = json.loads(f.read(head_len))
+            columns = []
+            for typecode, count in (("d", n), ("d", n), ("q", m), ("q", m), ("d", m)):
+                column = array(typecode)
+                column.fromfile(f, count)
+                if typecode == "q":
+                    column = array("l", column)
+                columns.append(column)
+            one_way = f.read(m)
+
+        xs, ys, sources, targets, lengths = columns
+        if not self.names:
+            # пустой сборщик: массивы берутся как есть
+            self.names = names
+            self.index = NodeIndex(self)
+            self.index.update((name, i) for i, name in enumerate(names))
+            self.xs, self.ys = xs, ys
+            self.sources, self.targets, self.lengths = sources, targets, lengths
+            self.one_way = bytearray(one_way)
+            return self
+
+        remap = array("l", map(self.index.__getitem__, names))
+        for i in range(n):
+            if not math.isnan(xs[i]):
+                self.xs[remap[i]] = xs[i]
+                self.ys[remap[i]] = ys[i]
+        self.sources.extend(remap[i] for i in sources)
+        self.targets.extend(remap[i] for i in targets)
+        self.lengths.extend(lengths)
+        self.one_way.extend(one_way)
+        return self
+
+    # замороженный Graph: смежность - FrozenAdjacency, add_node/add_edge запрещены
+    def build(self):
+        started = time.perf_counter()
+        n = len(self.names)
+        names = self.names
+
+        two_way = self.one_way.translate(TWO_WAY)
+        heads = self.sources + array("l", compress(self.targets, two_way))
+        tails = self.targets + array("l", compress(self.sources, two_way))
+        lengths = self.lengths + array("d", compress(self.lengths, two_way))
+
+        graph = Graph()
+        graph.nodes.names = self.graph_names = list(names)
+        graph.nodes.index = self.graph_index = dict(self.index)
+        graph.nodes.xs = array("d", self.xs)
+        graph.nodes.ys = array("d", self.ys)
+        graph.graph = FrozenAdjacency(self.graph_names, self.graph_index, heads, tails, lengths)
+        graph.reverse = FrozenAdjacency(self.graph_names, self.graph_index, tails, heads, lengths)
+        # прямая смежность нужна любому поиску, раскладывается сразу
+        graph.graph.layout()
+        graph.frozen = True
+
+        seconds = time.perf_counter() - started
+        self.stats = {
+            "nodes": n,
+            "edges": len(self.sources),
+            "seconds": seconds,
+            "edges_per_sec": len(self.sources) / seconds if seconds else math.inf,
+        }
+        return graph
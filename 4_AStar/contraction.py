@@ -0,0 +1,252 @@
+import heapq
+import math
+from array import array
+
+from a_star import Graph
+
+
+# иерархия сжатия: вершины сжимаются по очереди, вместо каждой сжатой добавляются
+# рёбра-ярлыки между её соседями. запрос - двунаправленный Дейкстра только вверх по рангам
+class ContractionHierarchy:
+    def __init__(self, names, rank, up, down, middle):
+        self.names = names # номер -> имя
+        self.index = {name: i for i, name in enumerate(names)}
+        self.rank = rank # номер -> порядок сжатия
+        # up: рёбра v -> x в вершины с большим рангом, down: рёбра u -> v из вершин с большим рангом
+        self.up_offsets, self.up_targets, self.up_weights = up
+        self.down_offsets, self.down_targets, self.down_weights = down
+        self.middle = middle # (a, b) -> вершина, через которую идёт ярлык a -> b
+        self.last_settled = 0
+
+    @classmethod
+    def build(cls, graph: Graph, witness_limit=60):
+        names = list(graph.nodes.names)
+        index = graph.nodes.index
+        n = len(names)
+        inf = math.inf
+
+        out = [{} for _ in range(n)]
+        inn = [{} for _ in range(n)]
+        for name, edges in graph.graph.items():
+            u = index[name]
+            for neighbor, length in edges:
+                v = index[neighbor]
+                if u == v:
+                    continue
+                if length < out[u].get(v, inf):
+                    out[u][v] = length
+                    inn[v][u] = length
+
+        middle = {}
+        contracted = bytearray(n)
+        deleted = array("l", [0]) * n
+        rank = array("l", [0]) * n
+        up_edges = [None] * n
+        down_edges = [None] * n
+
+        # поиск свидетеля: есть ли из u путь в обход v не длиннее limit
+        def witness(u, v, limit):
+            dist = {u: 0.0}
+            queue = [(0.0, u)]
+            settled = 0
+            while queue and settled < witness_limit:
+                d, x = heapq.heappop(queue)
+                if d > dist[x]:
+                    continue
+                if d > limit:
+                    break
+                settled += 1
+                for y, w in out[x].items():
+                    if y == v or contracted[y]:
+                        continue
+                    nd = d + w
+                    if nd < dist.get(y, inf):
+                        dist[y] = nd
+                        heapq.heappush(queue, (nd, y))
+            return dist
+
+        def shortcuts_for(v):
+            ins = list(inn[v].items())
+            outs = list(out[v].items())
+            result = []
+            if not outs:
+                return result, ins, outs
+            max_out = max(w for _, w in outs)
+            for u, wu in ins:
+                dist = witness(u, v, wu + max_out)
+                for x, wx in outs:
+                    if x == u:
+                        continue
+                    if dist.get(x, inf) > wu + wx:
+                        result.append((u, x, wu + wx))
+            return result, ins, outs
+
+        def priority(v):
+            shortcuts, ins, outs = shortcuts_for(v)
+            return len(shortcuts) - len(ins) - len(outs) + deleted[v]
+
+        queue = [(priority(v), v) for v in range(n)]
+        heapq.heapify(queue)
+        order = 0
+        while queue:
+            _, v = heapq.heappop(queue)
+            # ленивое обновление: приоритет мог вырасти после сжатия соседей
+            current = priority(v)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, v))
+                continue
+
+            shortcuts, ins, outs = shortcuts_for(v)
+            rank[v] = order
+            order += 1
+            contracted[v] = 1
+            up_edges[v] = outs
+            down_edges[v] = ins
+
+            for u, _ in ins:
+                del out[u][v]
+                deleted[u] += 1
+            for x, _ in outs:
+                del inn[x][v]
+                deleted[x] += 1
+            out[v] = {}
+            inn[v] = {}
+
+            for u, x, w in shortcuts:
+                if w < out[u].get(x, inf):
+                    out[u][x] = w
+                    inn[x][u] = w
+                    middle[(u, x)] = v
+
+        # ярлык живёт в middle, только пока он остался ребром иерархии
+        kept = {}
+        for v in range(n):
+            for x, _ in up_edges[v]:
+                if (v, x) in middle:
+                    kept[(v, x)] = middle[(v, x)]
+            for u, _ in down_edges[v]:
+                if (u, v) in middle:
+                    kept[(u, v)] = middle[(u, v)]
+
+        return cls(names, rank, cls.flatten(up_edges), cls.flatten(down_edges), kept)
+
+    @staticmethod
+    def flatten(edges):
+        offsets = array("l", [0])
+        targets = array("l")
+        weights = array("d")
+        for items in edges:
+            for x, w in items:
+                targets.append(x)
+                weights.append(w)
+            offsets.append(len(targets))
+        return offsets, targets, weights
+
+    def query(self, start, end):
+        inf = math.inf
+        s, t = self.index[start], self.index[end]
+        if s == t:
+            return [start], 0
+
+        dist = ({s: 0.0}, {t: 0.0})
+        parent = ({}, {})
+        queues = ([(0.0, s)], [(0.0, t)])
+        graphs = (
+            (self.up_offsets, self.up_targets, self.up_weights),
+            (self.down_offsets, self.down_targets, self.down_weights),
+        )
+        mu, meet = inf, -1
+        settled = 0
+
+        side = 0
+        while queues[0] or queues[1]:
+            # сторона, у которой верх кучи не меньше mu, дальше не нужна
+            if not queues[side] or queues[side][0][0] >= mu:
+                side = 1 - side
+                if not queues[side] or queues[side][0][0] >= mu:
+                    break
+
+            d, x = heapq.heappop(queues[side])
+            if d > dist[side][x]:
+                side = 1 - side
+                continue
+            settled += 1
+
+            if x in dist[1 - side] and d + dist[1 - side][x] < mu:
+                mu = d + dist[1 - side][x]
+                meet = x
+
+            offsets, targets, weights = graphs[side]
+            for k in range(offsets[x], offsets[x + 1]):
+                y = targets[k]
+                nd = d + weights[k]
+                if nd < dist[side].get(y, inf):
+                    dist[side][y] = nd
+                    parent[side][y] = x
+                    heapq.heappush(queues[side], (nd, y))
+            side = 1 - side
+
+        self.last_settled = settled
+        if meet < 0:
+            return None, inf
+
+        forward = [meet]
+        while forward[-1] != s:
+            forward.append(parent[0][forward[-1]])
+        forward.reverse()
+        backward = [meet]
+        while backward[-1] != t:
+            backward.append(parent[1][backward[-1]])
+
+        path = self.unpack(forward + backward[1:])
+        return [self.names[i] for i in path], mu
+
+    # матрица многие-ко-многим: обратный подъём от каждой цели раскладывает расстояния
+    # по корзинам вершин, прямой подъём от источника собирает минимум по корзинам
+    def matrix(self, origins, destinations):
+        inf = math.inf
+        buckets = {}
+        for j, name in enumerate(destinations):
+            for x, d in self.upward(self.index[name], self.down_offsets, self.down_targets, self.down_weights).items():
+                buckets.setdefault(x, []).append((j, d))
+
+        rows = []
+        for name in origins:
+            row = array("d", [inf]) * len(destinations)
+            for x, d in self.upward(self.index[name], self.up_offsets, self.up_targets, self.up_weights).items():
+                for j, dj in buckets.get(x, ()):
+                    if d + dj < row[j]:
+                        row[j] = d + dj
+            rows.append(row)
+        return rows
+
+    # полный Дейкстра по рёбрам одного направления иерархии
+    def upward(self, source, offsets, targets, weights):
+        dist = {source: 0.0}
+        queue = [(0.0, source)]
+        while queue:
+            d, x = heapq.heappop(queue)
+            if d > dist[x]:
+                continue
+            for k in range(offsets[x], offsets[x + 1]):
+                y = targets[k]
+                nd = d + weights[k]
+                if nd < dist.get(y, math.inf):
+                    dist[y] = nd
+                    heapq.heappush(queue, (nd, y))
+        return dist
+
+    # разворачивает ярлыки обратно в исходные рёбра
+    def unpack(self, path):
+        result = [path[0]]
+        for a, b in zip(path, path[1:]):
+            stack = [(a, b)]
+            while stack:
+                x, y = stack.pop()
+                m = self.middle.get((x, y))
+                if m is None:
+                    result.append(y)
+                else:
+                    stack.append((m, y))
+                    stack.append((x, m))
+        return result
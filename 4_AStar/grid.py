@@ -0,0 +1,317 @@
+import heapq
+import math
+
+
+SQRT2 = math.sqrt(2)
+REVERSED = bytes(int(f"{b:08b}"[::-1], 2) for b in range(256))
+# k-й бит байта -> ASCII '0'/'1', чтобы столбец собирался в число через int(..., 2)
+COLUMN_DIGITS = [bytes(49 if b & (0x80 >> k) else 48 for b in range(256)) for k in range(8)]
+
+
+# карта препятствий: один бит на клетку, строки выровнены по байту, старший бит - левая клетка.
+# это раскладка бинарного PBM (P4), поэтому файл читается без перепаковки.
+# смежность не хранится: соседи клетки вычисляются на лету, ход по диагонали
+# разрешён, только если свободны обе прилегающие прямые клетки
+class GridMap:
+    def __init__(self, width, height, bits=None):
+        self.width = width
+        self.height = height
+        self.stride = (width + 7) // 8
+        self.bits = bits if bits is not None else bytearray(self.stride * height) # 1 - препятствие
+        # строки и столбцы как большие числа (бит i - клетка i, за краем - препятствие)
+        # и маски остановки прыжка; заводятся лениво, сбрасываются при изменении карты
+        self.lines = {}
+        self.stops = {}
+        self.last_expanded = {"forward": 0, "backward": 0}
+
+    @classmethod
+    def from_rows(cls, rows, blocked="#"):
+        rows = list(rows)
+        grid = cls(max(len(row) for row in rows), len(rows))
+        for y, row in enumerate(rows):
+            for x, cell in enumerate(row):
+                if cell in blocked:
+                    grid.block(x, y)
+        return grid
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        fields = []
+        pos = 0
+        # заголовок P4: магия, ширина, высота, разделённые пробелами, комментарии с '#'
+        while len(fields) < 3:
+            while data[pos:pos + 1].isspace():
+                pos += 1
+            if pos >= len(data):
+                raise ValueError(f"{path}: файл обрезан")
+            if data[pos:pos + 1] == b"#":
+                pos = data.find(b"\n", pos) + 1
+                if pos == 0:
+                    raise ValueError(f"{path}: файл обрезан")
+                continue
+            end = pos
+            while end < len(data) and not data[end:end + 1].isspace():
+                end += 1
+            if end >= len(data):
+                raise ValueError(f"{path}: файл обрезан")
+            fields.append(data[pos:end])
+            pos = end
+        if fields[0] != b"P4":
+            raise ValueError(f"{path}: не бинарный PBM (P4)")
+        width, height = int(fields[1]), int(fields[2])
+        stride = (width + 7) // 8
+        bits = bytearray(data[pos + 1:pos + 1 + stride * height])
+        if len(bits) != stride * height:
+            raise ValueError(f"{path}: файл обрезан")
+        return cls(width, height, bits)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(f"P4\n{self.width} {self.height}\n".encode("ascii"))
+            f.write(self.bits)
+
+    def block(self, x, y, blocked=True):
+        if self.lines:
+            self.lines.clear()
+            self.stops.clear()
+        i = y * self.stride + (x >> 3)
+        if blocked:
+            self.bits[i] |= 0x80 >> (x & 7)
+        else:
+            self.bits[i] &= ~(0x80 >> (x & 7)) & 0xFF
+
+    def free(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height and not self.bits[y * self.stride + (x >> 3)] & (0x80 >> (x & 7))
+
+    def heuristic(self, x, y, end, heuristic="octile"):
+        dx, dy = abs(x - end[0]), abs(y - end[1])
+        if heuristic == "octile":
+            return max(dx, dy) + (SQRT2 - 1) * min(dx, dy)
+        if heuristic == "euclid":
+            return math.hypot(dx, dy)
+        if heuristic == "zero":
+            return 0
+        raise ValueError(f"неизвестная эвристика {heuristic}")
+
+    # тот же интерфейс, что у Graph.a_star: вершины - клетки (x, y), ответ - (путь, длина).
+    # jump=True включает jump point search: в очередь попадают только точки прыжка
+    def a_star(self, start, end, heuristic="octile", jump=True):
+        for x, y in (start, end):
+            if not self.free(x, y):
+                raise ValueError(f"клетка {(x, y)} занята или вне карты")
+
+        width = self.width
+        s = start[1] * width + start[0]
+        t = end[1] * width + end[0]
+        successors = self.jump_successors if jump else self.neighbors
+
+        distance = {s: 0}
+        route = {}
+        queue = [(self.heuristic(start[0], start[1], end, heuristic), s)]
+        expanded = 0
+
+        while queue:
+            f, current = heapq.heappop(queue)
+            if current == t:
+                self.last_expanded = {"forward": expanded, "backward": 0}
+                return self.reconstruct_path(route, t), distance[t]
+            y, x = divmod(current, width)
+            d = distance[current]
+            if f > d + self.heuristic(x, y, end, heuristic):
+                continue
+            expanded += 1
+
+            parent = route.get(current)
+            if parent is None:
+                px, py = x, y
+            else:
+                py, px = divmod(parent, width)
+
+            for nx, ny in successors(x, y, px, py, end):
+                step = max(abs(nx - x), abs(ny - y))
+                cost = step * SQRT2 if nx != x and ny != y else step
+                new_distance = d + cost
+                key = ny * width + nx
+                if new_distance < distance.get(key, math.inf):
+                    distance[key] = new_distance
+                    route[key] = current
+                    heapq.heappush(queue, (new_distance + self.heuristic(nx, ny, end, heuristic), key))
+
+        self.last_expanded = {"forward": expanded, "backward": 0}
+        return None, float("inf")
+
+    def neighbors(self, x, y, px=None, py=None, end=None):
+        free = self.free
+        result = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if dx == dy == 0 or not free(x + dx, y + dy):
+                    continue
+                if dx and dy and not (free(x + dx, y) and free(x, y + dy)):
+                    continue
+                result.append((x + dx, y + dy))
+        return result
+
+    # соседи после отсечения симметричных путей: естественные и вынужденные направления
+    # от направления прихода, из каждого делается прыжок до следующей точки прыжка
+    def jump_successors(self, x, y, px, py, end):
+        free = self.free
+        dx = (x > px) - (x < px)
+        dy = (y > py) - (y < py)
+
+        if dx == 0 and dy == 0:
+            directions = [(nx - x, ny - y) for nx, ny in self.neighbors(x, y)]
+        elif dx and dy:
+            directions = []
+            if free(x, y + dy):
+                directions.append((0, dy))
+            if free(x + dx, y):
+                directions.append((dx, 0))
+            if free(x, y + dy) and free(x + dx, y):
+                directions.append((dx, dy))
+        elif dx:
+            directions = []
+            up, down = free(x, y + 1), free(x, y - 1)
+            if free(x + dx, y):
+                directions.append((dx, 0))
+                if up:
+                    directions.append((dx, 1))
+                if down:
+                    directions.append((dx, -1))
+            if up:
+                directions.append((0, 1))
+            if down:
+                directions.append((0, -1))
+        else:
+            directions = []
+            right, left = free(x + 1, y), free(x - 1, y)
+            if free(x, y + dy):
+                directions.append((0, dy))
+                if right:
+                    directions.append((1, dy))
+                if left:
+                    directions.append((-1, dy))
+            if right:
+                directions.append((1, 0))
+            if left:
+                directions.append((-1, 0))
+
+        result = []
+        for ddx, ddy in directions:
+            if ddx and ddy and not (free(x + ddx, y) and free(x, y + ddy)):
+                continue
+            point = self.jump(x + ddx, y + ddy, ddx, ddy, end)
+            if point is not None:
+                result.append(point)
+        return result
+
+    # прыжок из (x, y) в направлении (dx, dy) без рекурсии: по диагонали на каждом шаге
+    # проверяются прямые прыжки вдоль обеих составляющих
+    def jump(self, x, y, dx, dy, end):
+        if not (dx and dy):
+            return self.scan(x, y, dx, dy, end)
+        free = self.free
+        while True:
+            if not free(x, y):
+                return None
+            if (x, y) == end:
+                return x, y
+            if self.scan(x + dx, y, dx, 0, end) or self.scan(x, y + dy, 0, dy, end):
+                return x, y
+            if not (free(x + dx, y) and free(x, y + dy)):
+                return None
+            x += dx
+            y += dy
+
+    # прямой прыжок целиком на битовых масках: ищется ближайшее по ходу препятствие,
+    # вынужденный сосед или цель, без обхода клеток по одной
+    def scan(self, x, y, dx, dy, end):
+        if dx:
+            axis, line, i, step, length = 0, y, x, dx, self.width
+            target = end[0] if end[1] == y else None
+        else:
+            axis, line, i, step, length = 1, x, y, dy, self.height
+            target = end[1] if end[0] == x else None
+        if not 0 <= line < (self.height if axis == 0 else self.width) or not 0 <= i < length:
+            return None
+
+        blocked = self.line(axis, line)
+        stops = self.stop_mask(axis, line, step)
+        if step > 0:
+            wall = lowest_bit(blocked >> i) + i
+            stop = lowest_bit(stops >> i) + i
+            if target is not None and target >= i:
+                stop = min(stop, target)
+            if stop >= wall:
+                return None
+        else:
+            window = (1 << (i + 1)) - 1
+            wall = (blocked & window).bit_length() - 1
+            stop = (stops & window).bit_length() - 1
+            if target is not None and target <= i:
+                stop = max(stop, target)
+            if stop <= wall:
+                return None
+        return (stop, y) if axis == 0 else (x, stop)
+
+    def line(self, axis, index):
+        key = (axis, index)
+        mask = self.lines.get(key)
+        if mask is None:
+            length = self.width if axis == 0 else self.height
+            if not 0 <= index < (self.height if axis == 0 else self.width):
+                mask = (1 << (length + 1)) - 1
+            elif axis == 0:
+                row = self.bits[index * self.stride:(index + 1) * self.stride]
+                mask = int.from_bytes(row.translate(REVERSED), "little") & ((1 << length) - 1)
+            else:
+                column = self.bits[index >> 3::self.stride].translate(COLUMN_DIGITS[index & 7])
+                mask = int(column[::-1], 2)
+            mask |= 1 << length
+            self.lines[key] = mask
+        return mask
+
+    # клетка i - остановка, если в соседней линии клетка i свободна, а i - step занята
+    def stop_mask(self, axis, index, step):
+        key = (axis, index, step)
+        mask = self.stops.get(key)
+        if mask is None:
+            length = self.width if axis == 0 else self.height
+            full = (1 << length) - 1
+            mask = 0
+            for side in (index - 1, index + 1):
+                side_mask = self.line(axis, side)
+                behind = (side_mask << 1) | 1 if step > 0 else side_mask >> 1
+                mask |= ~side_mask & full & behind
+            self.stops[key] = mask
+        return mask
+
+    # путь по клеткам: между соседними точками прыжка идёт прямая или диагональ
+    def reconstruct_path(self, route, end):
+        width = self.width
+        points = []
+        current = end
+        while current is not None:
+            points.append(divmod(current, width)[::-1])
+            current = route.get(current)
+        points.reverse()
+
+        path = [points[0]]
+        for (x1, y1), (x2, y2) in zip(points, points[1:]):
+            dx = (x2 > x1) - (x2 < x1)
+            dy = (y2 > y1) - (y2 < y1)
+            x, y = x1, y1
+            while (x, y) != (x2, y2):
+                x += dx
+                y += dy
+                path.append((x, y))
+        return path
+
+
+# номер младшего единичного бита, для нуля - бесконечность
+def lowest_bit(value):
+    if not value:
+        return math.inf
+    return (value & -value).bit_length() - 1
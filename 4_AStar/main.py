@@ -1,24 +1,125 @@
+import heapq
+import math
+
+from a_star import Graph
+
+
 class Node:
-    def __init__(self):
-        self.has_fuel:bool
+    def __init__(self, name: str, has_fuel: bool = False):
+        self.name = name
+        self.has_fuel: bool = has_fuel
 
-class Edge:
-    def __init__(self):
-        pass
 
 class Plane:
-    def __init__(self):
-        self.tank_capacity: float
-        self.base_fuel: float
-        self.cruise_speed: float
-        self.empty_mass: float
-        self.fuel_current_mass: float = self.tank_capacity
+    def __init__(self, tank_capacity: float, base_fuel: float, cruise_speed: float, empty_mass: float, fuel_current_mass: float = None):
+        self.tank_capacity: float = tank_capacity
+        self.base_fuel: float = base_fuel # расход на единицу пути для пустого самолёта
+        self.cruise_speed: float = cruise_speed
+        self.empty_mass: float = empty_mass
+        self.fuel_current_mass: float = self.tank_capacity if fuel_current_mass is None else fuel_current_mass
 
     def count_current_mass(self) -> float:
         m = self.empty_mass + self.fuel_current_mass
         return m
 
-class Graph:
-    def __init__(self):
-        pass
+    # расход пропорционален текущей массе: dm/ds = -base_fuel * m / empty_mass,
+    # поэтому на отрезке length сгорает m * (1 - exp(-base_fuel * length / empty_mass))
+    def burn(self, fuel: float, length: float) -> float:
+        mass = self.empty_mass + fuel
+        return mass * -math.expm1(-self.base_fuel * length / self.empty_mass)
+
+    def flight_time(self, length: float) -> float:
+        return length / self.cruise_speed
+
+
+# поиск с ограничением по топливу: состояние - (вершина, уровень топлива), топливо
+# округляется вниз до шага fuel_step. метки снимаются по времени, поэтому метка в вершине
+# доминируется, если там уже снята метка с не меньшим топливом
+class FuelRouter:
+    def __init__(self, graph: Graph, plane: Plane, nodes: dict, fuel_step: float = None, refuel_time: float = 0.0):
+        self.graph = graph
+        self.plane = plane
+        self.nodes = nodes # имя -> Node
+        self.fuel_step = fuel_step if fuel_step else plane.tank_capacity / 100
+        self.refuel_time = refuel_time
+        self.levels = int(plane.tank_capacity / self.fuel_step + 1e-9)
+        self.explored = 0
+        self.pruned = 0
+
+    def level(self, fuel: float) -> int:
+        return min(self.levels, int(fuel / self.fuel_step + 1e-9))
+
+    def has_fuel(self, name: str) -> bool:
+        node = self.nodes.get(name)
+        return node is not None and node.has_fuel
+
+    def route(self, start: str, end: str):
+        if start not in self.graph.nodes or end not in self.graph.nodes:
+            raise KeyError(f"нет вершины {start if start not in self.graph.nodes else end}")
+
+        self.explored = 0
+        self.pruned = 0
+        # метка: (время, вершина, уровень топлива, заправка в вершине, родитель)
+        labels = []
+        best_level = {} # вершина -> наибольший уровень среди снятых меток
+        seen = {} # (вершина, уровень) -> лучшее время в очереди
+        queue = []
+
+        def push(time, node, level, refueled, parent):
+            if level <= best_level.get(node, -1) or time >= seen.get((node, level), math.inf):
+                self.pruned += 1
+                return
+            seen[(node, level)] = time
+            labels.append((time, node, level, refueled, parent))
+            heapq.heappush(queue, (time, -level, len(labels) - 1))
+
+        push(0.0, start, self.level(self.plane.fuel_current_mass), False, -1)
+
+        while queue:
+            time, negative_level, label = heapq.heappop(queue)
+            _, node, level, refueled, _ = labels[label]
+            if level <= best_level.get(node, -1):
+                self.pruned += 1
+                continue
+            best_level[node] = level
+            self.explored += 1
+
+            if node == end:
+                return self.result(labels, label)
+
+            if not refueled and level < self.levels and self.has_fuel(node):
+                push(time + self.refuel_time, node, self.levels, True, label)
+
+            fuel = level * self.fuel_step
+            for neighbor, length in self.graph.graph[node]:
+                burned = self.plane.burn(fuel, length)
+                if burned > fuel:
+                    continue
+                push(time + self.plane.flight_time(length), neighbor, self.level(fuel - burned), False, label)
+
+        return None
+
+    def result(self, labels, label):
+        chain = []
+        while label >= 0:
+            chain.append(labels[label])
+            label = labels[label][4]
+        chain.reverse()
+
+        path = []
+        profile = [] # (вершина, топливо по прилёте, топливо при вылете)
+        for time, node, level, refueled, _ in chain:
+            fuel = level * self.fuel_step
+            if refueled:
+                profile[-1] = (node, profile[-1][1], fuel)
+                continue
+            path.append(node)
+            profile.append((node, fuel, fuel))
 
+        return {
+            "path": path,
+            "time": chain[-1][0],
+            "fuel": profile,
+            "explored": self.explored,
+            "pruned": self.pruned,
+        }